@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+도구 호출 수락 제어 (Admission Control)
+도구별 동시 실행 수를 제한하고, 초과 요청은 제한된 대기열에서 기한까지만
+기다리게 한 뒤 빠르게 거절합니다.
+"""
+
+import asyncio
+import functools
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import anyio
+
+from pipeline import error_response
+
+
+class _ToolState:
+    """도구별 실행 슬롯/대기열 상태와 지표"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiters: deque = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait = 0.0
+
+
+class AdmissionController:
+    """도구별 동시 실행 제한 + 기한이 있는 대기열
+
+    슬롯/대기열 상태는 이벤트 루프 스레드에서만 변경되며, 실제 도구 함수는
+    워커 스레드에서 실행되어 다른 요청을 막지 않습니다. 워커 스레드 수는 도구별
+    제한의 합으로 맞춰, 수락된 요청이 anyio 기본 제한(40)에서 기한 없이 기다리지 않게 합니다.
+    """
+
+    def __init__(self, default_limit: int = 32, limits: Optional[Dict[str, int]] = None,
+                 max_queue: int = 64, queue_timeout: float = 0.2):
+        self.default_limit = default_limit
+        self.limits = dict(limits or {})
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._states: Dict[str, _ToolState] = {}
+        self._thread_limiter = anyio.CapacityLimiter(1)
+
+    def _state(self, tool_name: str) -> _ToolState:
+        state = self._states.get(tool_name)
+        if state is None:
+            state = _ToolState(max(1, self.limits.get(tool_name, self.default_limit)))
+            self._states[tool_name] = state
+            self._thread_limiter.total_tokens = self.thread_capacity()
+        return state
+
+    def thread_capacity(self) -> int:
+        """모든 도구의 실행 슬롯 합 (워커 스레드 제한)"""
+        return sum(state.limit for state in self._states.values())
+
+    def guard(self, tool_name: str) -> Callable:
+        """동기 도구 함수를 수락 제어가 적용된 비동기 함수로 감싸는 데코레이터"""
+        def decorator(fn: Callable[..., Dict[str, Any]]) -> Callable:
+            self._state(tool_name)
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs) -> Dict[str, Any]:
+                state = self._state(tool_name)
+                rejection = await self._acquire(state)
+                if rejection is not None:
+                    return rejection
+                try:
+                    return await anyio.to_thread.run_sync(
+                        functools.partial(fn, *args, **kwargs), limiter=self._thread_limiter
+                    )
+                finally:
+                    self._release(state)
+
+            return wrapper
+        return decorator
+
+    async def _acquire(self, state: _ToolState) -> Optional[Dict[str, Any]]:
+        """실행 슬롯 획득, 실패 시 오류 응답 반환"""
+        if state.active < state.limit and not state.waiters:
+            state.active += 1
+            state.admitted += 1
+            return None
+
+        if len(state.waiters) >= self.max_queue:
+            state.rejected_queue_full += 1
+            return error_response("서버 혼잡", "요청이 많아 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+
+        # 슬롯이 반납되면 _release가 future를 완료시켜 슬롯을 넘겨줌
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        state.queued += 1
+        state.max_queue_depth = max(state.max_queue_depth, len(state.waiters))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(state)
+            state.rejected_timeout += 1
+            return error_response("서버 혼잡", "대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+        except BaseException:
+            # 요청 취소 시 이미 넘겨받은 슬롯은 다음 대기자에게 반납
+            if waiter.done() and not waiter.cancelled():
+                self._release(state)
+            raise
+        finally:
+            state.total_wait += time.perf_counter() - started
+            if waiter in state.waiters:
+                state.waiters.remove(waiter)
+        state.admitted += 1
+        return None
+
+    def _release(self, state: _ToolState) -> None:
+        """슬롯 반납 (대기자가 있으면 슬롯을 그대로 넘겨줌)"""
+        while state.waiters:
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        state.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        tools = {}
+        for tool_name, state in self._states.items():
+            tools[tool_name] = {
+                "limit": state.limit,
+                "active": state.active,
+                "queue_depth": len(state.waiters),
+                "max_queue_depth": state.max_queue_depth,
+                "admitted": state.admitted,
+                "queued": state.queued,
+                "rejected_queue_full": state.rejected_queue_full,
+                "rejected_timeout": state.rejected_timeout,
+                "avg_queue_wait_ms": round(state.total_wait / state.queued * 1000, 3) if state.queued else 0.0
+            }
+        return {
+            "max_queue": self.max_queue,
+            "queue_timeout_ms": round(self.queue_timeout * 1000),
+            "thread_capacity": self._thread_limiter.total_tokens,
+            "threads_busy": self._thread_limiter.borrowed_tokens,
+            "tools": tools
+        }
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """tool=N,tool2=M 형식의 도구별 동시 실행 제한 파싱"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        limits[name.strip()] = int(value)
+    return limits
+
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+코퍼스 레지스트리
+지역 방언/파트너별 답변 코퍼스를 코퍼스 ID로 관리하고,
+처음 사용할 때 로드하며 메모리 예산을 넘으면 LRU로 내보냅니다.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from responses import (
+    QUESTION_CATEGORIES,
+    CATEGORY_KEYWORDS,
+    detect_category,
+    get_all_response,
+    get_similar_questions,
+    get_all_question_examples,
+    get_corpus_version
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = "default"
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """컨테이너를 따라가며 객체가 점유한 바이트 수를 합산 (공유 객체는 한 번만 계산)"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    return size
+
+
+def normalize_corpus(responses: Dict[str, Any],
+                     categories: Optional[Dict[str, str]] = None,
+                     keywords: Optional[Dict[str, List[str]]] = None,
+                     default_category: Optional[str] = None):
+    """코퍼스 메타데이터 정규화 (JSON/바이너리 백엔드가 같은 버전과 감지 결과를 갖도록 공유)
+
+    카테고리 이름은 답변의 모든 카테고리에 대해 만들고, 빠진 이름은 기본 이름으로 채웁니다.
+    생략한(None) 키워드는 기본값에서 채우고, 빈 키워드는 그대로 둡니다.
+    코퍼스에 없는 카테고리의 키워드는 버립니다.
+
+    Returns:
+        (categories, keywords, default_category)
+    """
+    if default_category is not None and default_category not in responses:
+        raise ValueError(f"기본 카테고리가 코퍼스에 없습니다: {default_category}")
+    # 일부 카테고리 이름만 주어져도 모든 답변 카테고리에 이름을 채움
+    categories = {
+        category: (categories or {}).get(category, QUESTION_CATEGORIES.get(category, category))
+        for category in responses
+    }
+    if keywords is None:
+        keywords = CATEGORY_KEYWORDS
+    keywords = {category: list(words) for category, words in keywords.items() if category in responses}
+    # 키워드가 하나도 맞지 않을 때 쓰는 카테고리 (지정하지 않으면 첫 카테고리)
+    default_category = default_category or next(iter(responses), None)
+    return categories, keywords, default_category
+
+
+class Corpus:
+    """로드된 코퍼스와 파생 인덱스"""
+
+    def __init__(self, corpus_id: str, responses: Dict[str, Any],
+                 categories: Optional[Dict[str, str]] = None,
+                 keywords: Optional[Dict[str, List[str]]] = None,
+                 default_category: Optional[str] = None):
+        self.corpus_id = corpus_id
+        self.responses = responses
+        self.categories, self.keywords, self.default_category = normalize_corpus(
+            responses, categories, keywords, default_category
+        )
+        self.version = get_corpus_version(self.responses, self.keywords, self.default_category)
+        # 파생 인덱스: 카테고리별 질문 키 목록 (매칭 순서 유지)
+        self.question_keys = {category: list(questions.keys()) for category, questions in responses.items()}
+        self.size_bytes = deep_sizeof((self.responses, self.categories, self.keywords, self.question_keys))
+        self.load_seconds = 0.0
+        self.loaded_at = time.time()
+
+    def detect_category(self, question: str) -> str:
+        return detect_category(question, self.keywords, self.default_category)
+
+    def get_response(self, category: str, question_key: str, style: str, rng=None) -> str:
+        return get_all_response(category, question_key, style, self.responses, rng)
+
+    def get_similar_questions(self, category: str, question_key: str) -> list:
+        return get_similar_questions(category, question_key, self.responses)
+
+    def get_question_examples(self) -> dict:
+        return get_all_question_examples(self.responses)
+
+
+def load_corpus_file(corpus_id: str, path: str) -> Corpus:
+    """코퍼스 파일 로드 (.hqc는 mmap으로 열고, 그 외는 JSON으로 파싱)
+
+    JSON 형식: {"responses": {...}, "categories": {...}(선택), "keywords": {...}(선택),
+               "default_category": "..."(선택)}
+    """
+    if path.endswith(".hqc"):
+        from corpus_file import MappedCorpus
+        return MappedCorpus(corpus_id, path)
+    
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "responses" not in data:
+        raise ValueError(f"코퍼스 파일에 responses 항목이 없습니다: {path}")
+    return Corpus(corpus_id, data["responses"], data.get("categories"), data.get("keywords"),
+                  data.get("default_category"))
+
+
+class CorpusRegistry:
+    """코퍼스 ID별 지연 로딩 + 메모리 예산 기반 LRU 축출"""
+
+    def __init__(self, memory_budget: int = 256 * 1024 * 1024):
+        self.memory_budget = memory_budget
+        self._loaders: Dict[str, Callable[[], Corpus]] = {}
+        self._pinned = set()
+        self._loaded: "OrderedDict[str, Corpus]" = OrderedDict()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def register(self, corpus_id: str, loader: Callable[[], Corpus], pinned: bool = False) -> None:
+        """코퍼스 로더 등록 (pinned 코퍼스는 축출되지 않음)"""
+        with self._lock:
+            self._loaders[corpus_id] = loader
+            self._load_locks.setdefault(corpus_id, threading.Lock())
+            if pinned:
+                self._pinned.add(corpus_id)
+            # 로더가 바뀌면 다음 사용 시 다시 로드
+            self._loaded.pop(corpus_id, None)
+
+    def register_directory(self, directory: str) -> List[str]:
+        """디렉터리의 *.json, *.hqc 파일을 파일명(확장자 제외)을 ID로 등록 (같은 ID면 .hqc 우선)"""
+        registered = []
+        if not directory or not os.path.isdir(directory):
+            return registered
+        names = sorted(os.listdir(directory))
+        for name in names:
+            corpus_id, ext = os.path.splitext(name)
+            if ext not in (".json", ".hqc") or corpus_id == DEFAULT_CORPUS:
+                continue
+            if ext == ".json" and f"{corpus_id}.hqc" in names:
+                continue
+            path = os.path.join(directory, name)
+            self.register(corpus_id, lambda cid=corpus_id, p=path: load_corpus_file(cid, p))
+            registered.append(corpus_id)
+        return registered
+
+    def __contains__(self, corpus_id: str) -> bool:
+        return corpus_id in self._loaders
+
+    def ids(self) -> List[str]:
+        return list(self._loaders.keys())
+
+    def get(self, corpus_id: str = DEFAULT_CORPUS) -> Corpus:
+        """코퍼스 조회 (필요시 로드), 등록되지 않은 ID는 KeyError"""
+        with self._lock:
+            corpus = self._loaded.get(corpus_id)
+            if corpus is not None:
+                self._loaded.move_to_end(corpus_id)
+                return corpus
+            if corpus_id not in self._loaders:
+                raise KeyError(corpus_id)
+            load_lock = self._load_locks[corpus_id]
+
+        with load_lock:
+            # 다른 스레드가 먼저 로드했는지 확인
+            with self._lock:
+                corpus = self._loaded.get(corpus_id)
+                if corpus is not None:
+                    self._loaded.move_to_end(corpus_id)
+                    return corpus
+                loader = self._loaders[corpus_id]
+
+            started = time.perf_counter()
+            corpus = loader()
+            corpus.load_seconds = time.perf_counter() - started
+            logger.info(f"코퍼스 로드: {corpus_id} ({corpus.size_bytes} bytes, {corpus.load_seconds * 1000:.1f}ms)")
+
+            with self._lock:
+                self._loaded[corpus_id] = corpus
+                self._evict(keep=corpus_id)
+            return corpus
+
+    def _evict(self, keep: str) -> None:
+        """메모리 예산 초과 시 가장 오래 사용되지 않은 코퍼스부터 축출"""
+        while self._used_bytes() > self.memory_budget:
+            victim = next(
+                (cid for cid in self._loaded if cid != keep and cid not in self._pinned),
+                None
+            )
+            if victim is None:
+                break
+            evicted = self._loaded.pop(victim)
+            self.evictions += 1
+            logger.info(f"코퍼스 축출: {victim} ({evicted.size_bytes} bytes)")
+
+    def loaded(self) -> Dict[str, Corpus]:
+        """현재 메모리에 로드된 코퍼스"""
+        with self._lock:
+            return dict(self._loaded)
+
+    def _used_bytes(self) -> int:
+        return sum(corpus.size_bytes for corpus in self._loaded.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            corpora = {}
+            for corpus_id in self._loaders:
+                corpus = self._loaded.get(corpus_id)
+                corpora[corpus_id] = {
+                    "loaded": corpus is not None,
+                    "pinned": corpus_id in self._pinned,
+                    "version": corpus.version if corpus else None,
+                    "memory_bytes": corpus.size_bytes if corpus else 0,
+                    "mapped_bytes": getattr(corpus, "mapped_bytes", 0) if corpus else 0,
+                    "load_ms": round(corpus.load_seconds * 1000, 3) if corpus else None,
+                    "categories": len(corpus.categories) if corpus else None
+                }
+            return {
+                "corpora": corpora,
+                "memory_used_bytes": self._used_bytes(),
+                "memory_budget_bytes": self.memory_budget,
+                "evictions": self.evictions
+            }
+
+
+def load_builtin_corpus() -> Corpus:
+    """response_data의 내장 답변으로 기본 코퍼스 생성 (처음 로드할 때 답변 데이터 import)"""
+    from response_data import ALL_RESPONSES
+    return Corpus(DEFAULT_CORPUS, ALL_RESPONSES, QUESTION_CATEGORIES, CATEGORY_KEYWORDS)
+
+
+def create_registry(memory_budget: int, corpus_dir: Optional[str] = None,
+                    default_file: Optional[str] = None) -> CorpusRegistry:
+    """기본 코퍼스와 corpus_dir의 코퍼스를 등록한 레지스트리 생성
+
+    default_file(.hqc/.json)을 주면 내장 답변 데이터 대신 해당 파일을 기본 코퍼스로 사용하며,
+    이때 response_data는 import하지 않습니다.
+    """
+    registry = CorpusRegistry(memory_budget)
+    if default_file:
+        registry.register(DEFAULT_CORPUS, lambda: load_corpus_file(DEFAULT_CORPUS, default_file), pinned=True)
+    else:
+        registry.register(DEFAULT_CORPUS, load_builtin_corpus, pinned=True)
+    registry.register_directory(corpus_dir)
+    return registry
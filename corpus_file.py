@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+메모리 매핑 바이너리 코퍼스 파일 (.hqc)
+문자열 테이블, 오프셋 배열, 질문 키 인덱스를 한 파일에 담고 mmap으로 열어
+문자열은 접근할 때만 디코딩합니다. 같은 호스트의 여러 서버 프로세스가
+페이지 캐시의 한 사본을 공유합니다.
+
+파일 구조 (모든 정수는 little-endian u32):
+    헤더 (기본 카테고리 문자열 번호 포함) | 문자열 오프셋 (offset, length) | 카테고리 (key, label, kw_start, kw_count, q_start, q_count)
+    | 키워드 (sid) | 질문 (question, style_start, style_count) | 질문 키 인덱스 (카테고리별 정렬된 질문 번호)
+    | 스타일 (style, answer_start, answer_count) | 답변 (sid) | 문자열 데이터 (UTF-8)
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List, Optional
+
+from corpora import Corpus, deep_sizeof, normalize_corpus
+from responses import QUESTION_CATEGORIES, CATEGORY_KEYWORDS, get_corpus_version
+
+MAGIC = b"HQC1"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<4sIIIIIIIII")
+_STRING = struct.Struct("<II")
+_CATEGORY = struct.Struct("<IIIIII")
+_U32 = struct.Struct("<I")
+_QUESTION = struct.Struct("<III")
+_STYLE = struct.Struct("<III")
+
+
+def build_corpus_file(path: str, responses: Dict[str, Any],
+                      categories: Optional[Dict[str, str]] = None,
+                      keywords: Optional[Dict[str, List[str]]] = None,
+                      default_category: Optional[str] = None) -> str:
+    """답변 데이터를 바이너리 코퍼스 파일로 저장하고 코퍼스 버전 반환"""
+    categories, keywords, default_category = normalize_corpus(responses, categories, keywords, default_category)
+    version = get_corpus_version(responses, keywords, default_category)
+
+    strings: List[bytes] = []
+    string_ids: Dict[str, int] = {}
+
+    def sid(text: str) -> int:
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text.encode("utf-8"))
+        return string_ids[text]
+
+    version_sid = sid(version)
+    default_sid = sid(default_category or "")
+    category_rows, keyword_rows, question_rows, key_index, style_rows, answer_rows = [], [], [], [], [], []
+    # detect_category는 키워드 순서대로 검사하므로 키워드 카테고리를 먼저 기록
+    ordered = list(keywords) + [c for c in responses if c not in keywords]
+    for category in ordered:
+        questions = responses.get(category, {})
+        kw_start = len(keyword_rows)
+        keyword_rows.extend(sid(word) for word in keywords.get(category, []))
+        q_start = len(question_rows)
+        for question, styles in questions.items():
+            style_start = len(style_rows)
+            for style, answers in styles.items():
+                answer_start = len(answer_rows)
+                answer_rows.extend(sid(answer) for answer in answers)
+                style_rows.append((sid(style), answer_start, len(answers)))
+            question_rows.append((sid(question), style_start, len(styles)))
+        # 질문 키 인덱스: 카테고리 내 질문 번호를 UTF-8 바이트 순으로 정렬
+        key_index.extend(sorted(range(q_start, len(question_rows)),
+                                key=lambda i: strings[question_rows[i][0]]))
+        category_rows.append((
+            sid(category), sid(categories.get(category, category)),
+            kw_start, len(keyword_rows) - kw_start,
+            q_start, len(question_rows) - q_start
+        ))
+
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, len(strings), len(category_rows), len(keyword_rows),
+                          len(question_rows), len(style_rows), len(answer_rows), version_sid, default_sid)]
+    offset = 0
+    for data in strings:
+        parts.append(_STRING.pack(offset, len(data)))
+        offset += len(data)
+    parts.extend(_CATEGORY.pack(*row) for row in category_rows)
+    parts.extend(_U32.pack(row) for row in keyword_rows)
+    parts.extend(_QUESTION.pack(*row) for row in question_rows)
+    parts.extend(_U32.pack(row) for row in key_index)
+    parts.extend(_STYLE.pack(*row) for row in style_rows)
+    parts.extend(_U32.pack(row) for row in answer_rows)
+    parts.extend(strings)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(tmp_path, path)
+    return version
+
+
+class CorpusFile:
+    """mmap으로 연 바이너리 코퍼스 파일 (읽기 전용)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, format_version, self.n_strings, self.n_categories, self.n_keywords,
+         self.n_questions, self.n_styles, self.n_answers, self.version_sid,
+         self.default_sid) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"지원하지 않는 코퍼스 파일 형식입니다: {path}")
+
+        offset = _HEADER.size
+        self._strings_at = offset
+        offset += self.n_strings * _STRING.size
+        self._categories_at = offset
+        offset += self.n_categories * _CATEGORY.size
+        self._keywords_at = offset
+        offset += self.n_keywords * _U32.size
+        self._questions_at = offset
+        offset += self.n_questions * _QUESTION.size
+        self._key_index_at = offset
+        offset += self.n_questions * _U32.size
+        self._styles_at = offset
+        offset += self.n_styles * _STYLE.size
+        self._answers_at = offset
+        offset += self.n_answers * _U32.size
+        self._data_at = offset
+        self.size = len(self._mm)
+
+    def string(self, sid: int) -> str:
+        start, length = _STRING.unpack_from(self._mm, self._strings_at + sid * _STRING.size)
+        start += self._data_at
+        return self._mm[start:start + length].decode("utf-8")
+
+    def string_bytes(self, sid: int) -> bytes:
+        start, length = _STRING.unpack_from(self._mm, self._strings_at + sid * _STRING.size)
+        start += self._data_at
+        return self._mm[start:start + length]
+
+    def category(self, i: int):
+        return _CATEGORY.unpack_from(self._mm, self._categories_at + i * _CATEGORY.size)
+
+    def keyword(self, i: int) -> int:
+        return _U32.unpack_from(self._mm, self._keywords_at + i * _U32.size)[0]
+
+    def question(self, i: int):
+        return _QUESTION.unpack_from(self._mm, self._questions_at + i * _QUESTION.size)
+
+    def key_index(self, i: int) -> int:
+        return _U32.unpack_from(self._mm, self._key_index_at + i * _U32.size)[0]
+
+    def style(self, i: int):
+        return _STYLE.unpack_from(self._mm, self._styles_at + i * _STYLE.size)
+
+    def answer(self, i: int) -> int:
+        return _U32.unpack_from(self._mm, self._answers_at + i * _U32.size)[0]
+
+    @property
+    def version(self) -> str:
+        return self.string(self.version_sid)
+
+
+class _AnswerList(Sequence):
+    """스타일별 답변 목록 (선택된 답변만 디코딩)"""
+
+    def __init__(self, file: CorpusFile, start: int, count: int):
+        self._file = file
+        self._start = start
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._file.string(self._file.answer(self._start + i))
+
+
+class _StylesView(Mapping):
+    """질문 하나의 스타일 -> 답변 목록"""
+
+    def __init__(self, file: CorpusFile, start: int, count: int):
+        self._file = file
+        self._start = start
+        self._count = count
+
+    def _rows(self):
+        for i in range(self._start, self._start + self._count):
+            yield self._file.style(i)
+
+    def __getitem__(self, style: str) -> _AnswerList:
+        for style_sid, answer_start, answer_count in self._rows():
+            if self._file.string(style_sid) == style:
+                return _AnswerList(self._file, answer_start, answer_count)
+        raise KeyError(style)
+
+    def __iter__(self):
+        for style_sid, _, _ in self._rows():
+            yield self._file.string(style_sid)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class _QuestionsView(Mapping):
+    """카테고리 하나의 질문 -> 스타일 (질문 키는 순회할 때마다 하나씩 디코딩하고 보관하지 않음)"""
+
+    def __init__(self, file: CorpusFile, start: int, count: int):
+        self._file = file
+        self._start = start
+        self._count = count
+
+    def __getitem__(self, question: str) -> _StylesView:
+        # 질문 키 인덱스에서 UTF-8 바이트 기준 이진 탐색
+        target = question.encode("utf-8")
+        lo, hi = self._start, self._start + self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = self._file.question(self._file.key_index(mid))
+            key = self._file.string_bytes(row[0])
+            if key == target:
+                return _StylesView(self._file, row[1], row[2])
+            if key < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        raise KeyError(question)
+
+    def __iter__(self):
+        for i in range(self._start, self._start + self._count):
+            yield self._file.string(self._file.question(i)[0])
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class MappedCorpus(Corpus):
+    """바이너리 코퍼스 파일을 기반으로 한 코퍼스
+
+    카테고리 이름과 감지 키워드만 힙에 올리고, 질문/답변은 mmap에서 바로 읽습니다.
+    질문 키 목록은 파일의 질문 키 인덱스가 대신하므로 힙에 따로 만들지 않습니다.
+    """
+
+    def __init__(self, corpus_id: str, path: str):
+        self.file = CorpusFile(path)
+        self.corpus_id = corpus_id
+        self.categories: Dict[str, str] = {}
+        self.keywords: Dict[str, List[str]] = {}
+        self.responses: Dict[str, _QuestionsView] = {}
+        for i in range(self.file.n_categories):
+            key_sid, label_sid, kw_start, kw_count, q_start, q_count = self.file.category(i)
+            category = self.file.string(key_sid)
+            self.categories[category] = self.file.string(label_sid)
+            if kw_count:
+                self.keywords[category] = [
+                    self.file.string(self.file.keyword(j)) for j in range(kw_start, kw_start + kw_count)
+                ]
+            self.responses[category] = _QuestionsView(self.file, q_start, q_count)
+        self.default_category = self.file.string(self.file.default_sid) or None
+        self.version = self.file.version
+        self.question_keys: Dict[str, List[str]] = {}
+        self.size_bytes = deep_sizeof((self.responses, self.categories, self.keywords, self.question_keys))
+        self.mapped_bytes = self.file.size
+        self.load_seconds = 0.0
+        self.loaded_at = time.time()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="바이너리 코퍼스 파일(.hqc) 생성")
+    parser.add_argument("output", help="생성할 .hqc 파일 경로")
+    parser.add_argument("--source", help="원본 JSON 코퍼스 파일 (생략 시 기본 코퍼스)")
+    args = parser.parse_args()
+
+    if args.source:
+        with open(args.source, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        corpus_version = build_corpus_file(args.output, data["responses"], data.get("categories"),
+                                           data.get("keywords"), data.get("default_category"))
+    else:
+        from response_data import ALL_RESPONSES
+        corpus_version = build_corpus_file(args.output, ALL_RESPONSES, QUESTION_CATEGORIES, CATEGORY_KEYWORDS)
+    print(f"{args.output}: {os.path.getsize(args.output)} bytes, version {corpus_version}", file=sys.stderr)
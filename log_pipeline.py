@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+비차단 로깅 파이프라인
+로그 레코드를 제한된 큐에 넣고 백그라운드 스레드에서 JSON으로 출력합니다.
+큐가 가득 차면 요청을 멈추지 않고 로그를 버리며, 도구별 샘플링을 지원합니다.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from pipeline import DONE
+
+# 구조화 로그에 포함할 추가 필드
+STRUCTURED_FIELDS = ("tool", "category", "matched_key", "latency_ms", "corpus", "error")
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄 JSON으로 변환"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.utcfromtimestamp(record.created).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class ToolSamplingFilter(logging.Filter):
+    """tool 필드가 있는 레코드를 도구별 비율로 샘플링 (나머지 레코드는 통과)"""
+
+    def __init__(self, default_rate: float = 1.0, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = dict(rates or {})
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        tool = getattr(record, "tool", None)
+        if tool is None or record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(tool, self.default_rate)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """루트 로거에 연결된 큐 핸들러와 백그라운드 리스너"""
+
+    def __init__(self, level: int = logging.INFO, queue_size: int = 10000,
+                 default_rate: float = 1.0, rates: Optional[Dict[str, float]] = None, stream=None):
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.sampler = ToolSamplingFilter(default_rate, rates)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.handler.addFilter(self.sampler)
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter())
+        self.listener = logging.handlers.QueueListener(self.queue, output, respect_handler_level=True)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """남은 로그를 모두 출력하고 리스너 종료"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def queued_records(self) -> list:
+        """출력 대기 중인 로그 레코드 사본 (큐 잠금 안에서 복사)"""
+        with self.queue.mutex:
+            return list(self.queue.queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_size": self.queue.maxsize,
+            "queue_depth": self.queue.qsize(),
+            "enqueued": self.handler.enqueued,
+            "dropped": self.handler.dropped,
+            "sampled_out": self.sampler.sampled_out,
+            "default_sample_rate": self.sampler.default_rate,
+            "tool_sample_rates": self.sampler.rates
+        }
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """tool=0.1,tool2=0.5 형식의 도구별 샘플링 비율 파싱"""
+    rates = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        rates[name.strip()] = float(value)
+    return rates
+
+
+def tool_call_hook(logger: logging.Logger) -> Callable[[str, Any, float], None]:
+    """파이프라인이 끝날 때마다 도구명, 감지 카테고리 키, 매칭 질문, 코퍼스 ID, 지연 시간을
+    구조화 로그로 기록하는 파이프라인 훅"""
+    def hook(stage: str, ctx: Any, elapsed: float) -> None:
+        if stage != DONE:
+            return
+        fields = {
+            "tool": ctx.tool,
+            "category": ctx.detected_category,
+            "matched_key": ctx.question_key,
+            "latency_ms": round(elapsed * 1000, 3),
+            "corpus": ctx.corpus_id,
+            "error": ctx.error.get("error") if ctx.error is not None else None
+        }
+        logger.log(logging.WARNING if fields["error"] else logging.INFO, "tool call", extra=fields)
+    return hook
@@ -5,28 +5,103 @@ Holiday Question Helper MCP Server
 명절 질문 답변 생성기
 """
 
+import argparse
+import atexit
+import json
 import logging
+import os
+import random
+import sys
+import tracemalloc
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
+
+# 메모리 리포트용 할당 추적은 다른 모듈을 불러오기 전에 시작
+if os.environ.get("HOLIDAY_TRACEMALLOC") == "1" or "--memory-report" in sys.argv:
+    tracemalloc.start()
+
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from log_pipeline import LogPipeline, parse_rates, tool_call_hook
+
+# 로깅 설정 (큐 기반 비차단 JSON 로깅, 도구별 샘플링)
+LOG_LEVEL = os.environ.get("HOLIDAY_LOG_LEVEL", "INFO")
+LOG_QUEUE_SIZE = int(os.environ.get("HOLIDAY_LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATE = float(os.environ.get("HOLIDAY_LOG_SAMPLE_RATE", "1.0"))
+LOG_TOOL_SAMPLE_RATES = parse_rates(os.environ.get("HOLIDAY_LOG_TOOL_SAMPLE_RATES", ""))
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+log_pipeline = LogPipeline(
+    level=getattr(logging, LOG_LEVEL.upper(), logging.INFO),
+    queue_size=LOG_QUEUE_SIZE,
+    default_rate=LOG_SAMPLE_RATE,
+    rates=LOG_TOOL_SAMPLE_RATES
 )
+atexit.register(log_pipeline.stop)
 logger = logging.getLogger(__name__)
 from responses import (
-    QUESTION_CATEGORIES,
     RESPONSE_STYLES,
-    MARRIAGE_RESPONSES,
-    ALL_RESPONSES,
-    detect_category,
-    get_response,
-    get_all_response,
-    customize_response,
-    get_similar_questions,
-    get_all_question_examples
+    customize_response
+)
+from admission import AdmissionController, parse_limits
+from corpora import DEFAULT_CORPUS, create_registry
+from memory_report import build_memory_report
+from pipeline import Pipeline, RequestContext, StageCache, error_response
+from response_cache import ResponseCache, compute_etag, etag_matches, make_key
+from shadow import ShadowRunner
+from singleflight import SingleFlight
+from warm_cache import WarmCache
+
+# 코퍼스 레지스트리 설정 (추가 코퍼스는 HOLIDAY_CORPUS_DIR의 <코퍼스ID>.json)
+CORPUS_DIR = os.environ.get(
+    "HOLIDAY_CORPUS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+)
+CORPUS_MEMORY_BUDGET_MB = float(os.environ.get("HOLIDAY_CORPUS_MEMORY_BUDGET_MB", "256"))
+# 기본 코퍼스를 바이너리 코퍼스 파일(.hqc)에서 mmap으로 읽으려면 경로 지정
+DEFAULT_CORPUS_FILE = os.environ.get("HOLIDAY_DEFAULT_CORPUS_FILE") or None
+
+corpus_registry = create_registry(int(CORPUS_MEMORY_BUDGET_MB * 1024 * 1024), CORPUS_DIR, DEFAULT_CORPUS_FILE)
+
+# 웜 캐시 설정 (재시작 후에도 매칭 결과/맞춤 답변/인기 카운터 유지)
+CACHE_PATH = os.environ.get(
+    "HOLIDAY_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "warm_cache.json")
+)
+CACHE_SNAPSHOT_INTERVAL = float(os.environ.get("HOLIDAY_CACHE_SNAPSHOT_INTERVAL", "300"))
+
+# 기본 코퍼스 버전은 레지스트리에서 가져옴 (.hqc면 헤더의 버전을 쓰고 코퍼스 전체를 다시 해시하지 않음)
+warm_cache = WarmCache(corpus_registry.get(DEFAULT_CORPUS).version, path=CACHE_PATH or None)
+warm_cache.load()
+warm_cache.start_periodic_snapshot(CACHE_SNAPSHOT_INTERVAL)
+atexit.register(warm_cache.close)
+
+# 시드 고정 응답 캐시 설정
+RESPONSE_CACHE_SIZE = int(os.environ.get("HOLIDAY_RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_MAX_AGE = int(os.environ.get("HOLIDAY_RESPONSE_CACHE_MAX_AGE", "3600"))
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+
+# 섀도 모드 설정 (후보 감지/매칭 엔진을 샘플링된 호출에서 백그라운드로 비교, 0이면 끔)
+SHADOW_SAMPLE_RATE = float(os.environ.get("HOLIDAY_SHADOW_SAMPLE_RATE", "0"))
+SHADOW_MAX_PENDING = int(os.environ.get("HOLIDAY_SHADOW_MAX_PENDING", "100"))
+
+# 요청 병합 설정 (같은 질문의 감지/매칭을 기다리는 최대 시간, 넘으면 직접 실행)
+SINGLE_FLIGHT_WAIT_MS = float(os.environ.get("HOLIDAY_SINGLE_FLIGHT_WAIT_MS", "500"))
+
+# 수락 제어 설정 (도구별 동시 실행 제한, 무거운 도구는 더 낮게)
+MAX_CONCURRENCY = int(os.environ.get("HOLIDAY_MAX_CONCURRENCY", "32"))
+TOOL_CONCURRENCY = parse_limits(os.environ.get(
+    "HOLIDAY_TOOL_CONCURRENCY", "generate_multiple_responses=4,get_memory_report=1"
+))
+QUEUE_SIZE = int(os.environ.get("HOLIDAY_QUEUE_SIZE", "64"))
+QUEUE_TIMEOUT_MS = float(os.environ.get("HOLIDAY_QUEUE_TIMEOUT_MS", "200"))
+
+admission = AdmissionController(
+    default_limit=MAX_CONCURRENCY,
+    limits=TOOL_CONCURRENCY,
+    max_queue=QUEUE_SIZE,
+    queue_timeout=QUEUE_TIMEOUT_MS / 1000
 )
 
 # 검증 함수들
@@ -36,10 +111,16 @@ def validate_style(style: str) -> Tuple[bool, str]:
         return False, f"지원하지 않는 스타일입니다. 사용 가능: {', '.join(RESPONSE_STYLES.keys())}"
     return True, ""
 
-def validate_category(category: str) -> Tuple[bool, str]:
+def validate_category(category: str, categories: Dict[str, str]) -> Tuple[bool, str]:
     """카테고리 유효성 검증"""
-    if category not in QUESTION_CATEGORIES and category != "auto":
-        return False, f"지원하지 않는 카테고리입니다. 사용 가능: {', '.join(QUESTION_CATEGORIES.keys())}, auto"
+    if category not in categories and category != "auto":
+        return False, f"지원하지 않는 카테고리입니다. 사용 가능: {', '.join(categories.keys())}, auto"
+    return True, ""
+
+def validate_corpus(corpus_id: str) -> Tuple[bool, str]:
+    """코퍼스 유효성 검증"""
+    if corpus_id not in corpus_registry:
+        return False, f"지원하지 않는 코퍼스입니다. 사용 가능: {', '.join(corpus_registry.ids())}"
     return True, ""
 
 def sanitize_input(text: str) -> str:
@@ -48,19 +129,259 @@ def sanitize_input(text: str) -> str:
         return ""
     return text.strip()[:500]  # 최대 500자로 제한
 
+# 파이프라인 단계들
+def stage_sanitize(ctx: RequestContext) -> None:
+    """질문 정제"""
+    ctx.question = sanitize_input(ctx.question)
+    if not ctx.question:
+        ctx.fail("입력 오류", "질문을 입력해주세요.")
+
+def stage_validate(ctx: RequestContext) -> None:
+    """스타일/코퍼스/카테고리 검증 및 코퍼스 로드"""
+    invalid_styles = [s for s in ctx.styles if s not in RESPONSE_STYLES]
+    if invalid_styles:
+        if len(ctx.styles) == 1:
+            _, error_msg = validate_style(ctx.styles[0])
+        else:
+            error_msg = f"지원하지 않는 스타일: {', '.join(invalid_styles)}"
+        ctx.fail("입력 오류", error_msg)
+        return
+    
+    is_valid, error_msg = validate_corpus(ctx.corpus_id)
+    if not is_valid:
+        ctx.fail("입력 오류", error_msg)
+        return
+    ctx.corpus = corpus_registry.get(ctx.corpus_id)
+    
+    is_valid, error_msg = validate_category(ctx.category, ctx.corpus.categories)
+    if not is_valid:
+        ctx.fail("입력 오류", error_msg)
+
+def stage_detect(ctx: RequestContext) -> None:
+    """카테고리 자동 감지 또는 수동 설정"""
+    if ctx.category == "auto":
+        ctx.detected_category = ctx.corpus.detect_category(ctx.question)
+    else:
+        ctx.detected_category = ctx.category
+
+def stage_match(ctx: RequestContext) -> None:
+    """카테고리 내에서 질문과 매칭되는 질문 키 검색"""
+    ctx.question_key = match_question_key(ctx.corpus, ctx.detected_category, ctx.question)
+    if not ctx.question_key:
+        ctx.fail("답변 생성 실패", "적절한 답변을 찾을 수 없습니다.")
+
+def match_question_key(corpus, category: str, question: str) -> Optional[str]:
+    """질문을 포함하거나 질문에 포함되는 첫 질문 키 (없으면 카테고리의 첫 질문)"""
+    category_responses = corpus.responses.get(category, {})
+    
+    for key in category_responses.keys():
+        if key in question or question in key:
+            return key
+    
+    # 해당 카테고리의 첫 번째 질문으로 처리
+    return next(iter(category_responses), None)
+
+def stage_select(ctx: RequestContext) -> None:
+    """스타일별 답변 선택 (seed가 있으면 결정적으로 선택)"""
+    warm_cache.record_hit(ctx.corpus.version, ctx.corpus_id, ctx.detected_category, ctx.question_key)
+    ctx.responses = [
+        {
+            "style": RESPONSE_STYLES[style],
+            "style_key": style,
+            "response": ctx.corpus.get_response(ctx.detected_category, ctx.question_key, style, seeded_rng(ctx, style))
+        }
+        for style in ctx.styles
+    ]
+
+def seeded_rng(ctx: RequestContext, style: str) -> Optional[random.Random]:
+    """seed와 매칭 결과로부터 스타일별 난수 생성기 생성 (seed가 없으면 None)"""
+    if ctx.seed is None:
+        return None
+    return random.Random(f"{ctx.seed}|{ctx.corpus.version}|{ctx.detected_category}|{ctx.question_key}|{style}")
+
+def stage_customize(ctx: RequestContext) -> None:
+    """사용자 상황 반영"""
+    if not ctx.user_situation:
+        return
+    for item in ctx.responses:
+        item["response"] = customize_cached(item["response"], ctx.user_situation)
+
+def stage_envelope(ctx: RequestContext) -> None:
+    """도구별 결과 형식으로 변환 (seed가 있으면 ETag 포함)"""
+    ctx.result = ctx.envelope(ctx)
+    if ctx.seed is not None:
+        ctx.result["seed"] = ctx.seed
+        ctx.result["etag"] = compute_etag(ctx.result)
+
+def stage_response_cache(ctx: RequestContext) -> None:
+    """시드 고정 요청이면 캐시된 결과로 이후 단계를 모두 생략"""
+    if ctx.seed is None:
+        return
+    cached = response_cache.get(response_key(ctx))
+    if cached is not None:
+        result, (ctx.detected_category, ctx.question_key) = cached
+        # 생략되는 select 단계 대신 인기 질문 집계를 남기고, 로그에는 복원한 매칭 결과가 기록됨
+        warm_cache.record_hit(ctx.corpus.version, ctx.corpus_id, ctx.detected_category, ctx.question_key)
+        result["timestamp"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        ctx.result = result
+
+def store_response(stage: str, ctx: RequestContext, elapsed: float) -> None:
+    """envelope 단계가 끝난 시드 고정 결과를 응답 캐시에 저장"""
+    if stage == "envelope" and ctx.seed is not None and ctx.error is None:
+        response_cache.put(response_key(ctx), ctx.result, (ctx.detected_category, ctx.question_key))
+
+def response_key(ctx: RequestContext) -> Tuple:
+    return make_key(ctx.tool, ctx.corpus.version, ctx.question, ctx.styles,
+                    ctx.category, ctx.user_situation, ctx.seed)
+
+def customize_cached(response_text: str, user_situation: Dict[str, Any]) -> str:
+    """맞춤형 답변 변형 (웜 캐시 사용)"""
+    customized = warm_cache.get_variant(response_text, user_situation)
+    if customized is None:
+        customized = customize_response(response_text, user_situation)
+        warm_cache.put_variant(response_text, user_situation, customized)
+    return customized
+
+# 단계 단축 지점 (웜 캐시의 매칭 결과 재사용)
+def lookup_detect(ctx: RequestContext) -> bool:
+    """자동 감지 요청이면 감지 카테고리와 매칭 질문을 함께 재사용
+
+    적중/실패는 요청당 한 번만 집계하므로 실패는 매칭 단계 조회에서 셉니다.
+    """
+    if ctx.category != "auto":
+        return False
+    cached = warm_cache.get_resolution(ctx.corpus.version, "auto", ctx.question, count=False)
+    if cached is None:
+        return False
+    warm_cache.count_lookup(True)
+    ctx.detected_category, ctx.question_key = cached
+    return True
+
+def lookup_match(ctx: RequestContext) -> bool:
+    """감지 단계에서 이미 매칭되었거나 캐시에 있으면 매칭 단계 생략"""
+    if ctx.question_key:
+        return True
+    cached = warm_cache.get_resolution(ctx.corpus.version, ctx.detected_category, ctx.question)
+    if cached is None:
+        return False
+    ctx.question_key = cached[1]
+    return True
+
+def store_match(ctx: RequestContext) -> None:
+    resolved = (ctx.detected_category, ctx.question_key)
+    warm_cache.put_resolution(ctx.corpus.version, ctx.detected_category, ctx.question, resolved)
+    if ctx.category == "auto":
+        warm_cache.put_resolution(ctx.corpus.version, "auto", ctx.question, resolved)
+
+pipeline = Pipeline([
+    ("sanitize", stage_sanitize),
+    ("validate", stage_validate),
+    ("detect", stage_detect),
+    ("match", stage_match),
+    ("select", stage_select),
+    ("customize", stage_customize),
+    ("envelope", stage_envelope)
+])
+pipeline.insert_stage("validate", "response_cache", stage_response_cache)
+pipeline.set_cache("detect", StageCache(lookup_detect))
+pipeline.set_cache("match", StageCache(lookup_match, store_match))
+pipeline.add_hook(store_response)
+pipeline.add_hook(tool_call_hook(logger))
+
+# 같은 질문의 감지/매칭을 동시에 요청하면 한 번만 실행 (답변 선택은 요청마다 따로)
+resolution_flight = SingleFlight(SINGLE_FLIGHT_WAIT_MS / 1000)
+
+def resolution_key(ctx: RequestContext) -> Tuple:
+    return (ctx.corpus.version, ctx.category, ctx.question)
+
+pipeline.coalesce("detect", "match", resolution_key,
+                  share=("detected_category", "question_key", "error"), flight=resolution_flight)
+
+shadow = ShadowRunner(
+    legacy_detect=lambda corpus, question: corpus.detect_category(question),
+    legacy_match=match_question_key,
+    sample_rate=SHADOW_SAMPLE_RATE,
+    max_pending=SHADOW_MAX_PENDING
+)
+atexit.register(shadow.close)
+
+def shadow_compare(stage: str, ctx: RequestContext, elapsed: float) -> None:
+    """match 단계가 끝난 호출을 샘플링해 섀도 비교에 넘김 (사용자 결과에는 영향 없음)"""
+    if stage == "match" and ctx.error is None:
+        shadow.maybe_submit(ctx.corpus, ctx.category, ctx.question, ctx.detected_category, ctx.question_key)
+
+pipeline.add_hook(shadow_compare)
+
+# 도구별 결과 형식
+DISCLAIMER = "⚠️ 이 답변은 유머를 위한 것입니다. 실제 상황과 가족 관계를 고려해서 적절히 사용하세요."
+DISCLAIMER_PLURAL = "⚠️ 이 답변들은 유머를 위한 것입니다. 실제 상황과 가족 관계를 고려해서 적절히 사용하세요."
+
+def marriage_envelope(ctx: RequestContext) -> Dict[str, Any]:
+    return {
+        "question": ctx.question,
+        "matched_question": ctx.question_key,
+        "category": ctx.corpus.categories.get("marriage", "결혼 관련"),
+        "style": ctx.responses[0]["style"],
+        "response": ctx.responses[0]["response"],
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "disclaimer": DISCLAIMER
+    }
+
+def response_envelope(ctx: RequestContext) -> Dict[str, Any]:
+    return {
+        "question": ctx.question,
+        "matched_question": ctx.question_key,
+        "category": ctx.corpus.categories[ctx.detected_category],
+        "category_key": ctx.detected_category,
+        "style": ctx.responses[0]["style"],
+        "style_key": ctx.responses[0]["style_key"],
+        "response": ctx.responses[0]["response"],
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "disclaimer": DISCLAIMER
+    }
+
+def custom_envelope(ctx: RequestContext) -> Dict[str, Any]:
+    return {
+        "question": ctx.question,
+        "matched_question": ctx.question_key,
+        "category": ctx.corpus.categories[ctx.detected_category],
+        "style": ctx.responses[0]["style"],
+        "response": ctx.responses[0]["response"],
+        "user_situation": ctx.user_situation if ctx.user_situation else "상황 정보 미제공",
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "disclaimer": DISCLAIMER
+    }
+
+def multiple_envelope(ctx: RequestContext) -> Dict[str, Any]:
+    return {
+        "question": ctx.question,
+        "matched_question": ctx.question_key,
+        "category": ctx.corpus.categories[ctx.detected_category],
+        "responses": ctx.responses,
+        # 유사 질문 추천
+        "similar_questions": ctx.corpus.get_similar_questions(ctx.detected_category, ctx.question_key),
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "disclaimer": DISCLAIMER_PLURAL
+    }
+
 # FastMCP 서버 초기화
 mcp = FastMCP("Holiday Question Helper")
 
 @mcp.tool
+@admission.guard("generate_marriage_response")
 def generate_marriage_response(
     question: str,
-    style: str = "humorous"
+    style: str = "humorous",
+    corpus: str = DEFAULT_CORPUS,
+    seed: Optional[int] = None
 ) -> Dict[str, Any]:
     """결혼 관련 질문에 대한 답변을 생성합니다.
     
     Args:
         question: 친척이 한 질문 (예: "결혼은 언제 하니?", "왜 아직도 안 결혼했어?", "소개팅 안 해?")
         style: 답변 스타일 (humorous, witty, polite, reverse, wise)
+        corpus: 사용할 답변 코퍼스 ID (기본값: default)
+        seed: 지정하면 같은 요청에 항상 같은 답변을 반환 (선택)
     
     Returns:
         dict: {
@@ -72,63 +393,24 @@ def generate_marriage_response(
             "disclaimer": "이 답변은 유머를 위한 것입니다. 실제 상황에 맞게 조절하세요."
         }
     """
-    try:
-        # 입력 검증
-        question = sanitize_input(question)
-        if not question:
-            return {
-                "error": "입력 오류",
-                "message": "질문을 입력해주세요.",
-                "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-        
-        is_valid, error_msg = validate_style(style)
-        if not is_valid:
-            return {
-                "error": "입력 오류",
-                "message": error_msg,
-                "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-        
-        # 질문 매칭
-        question_key = None
-        for key in MARRIAGE_RESPONSES.keys():
-            if key in question or question in key:
-                question_key = key
-                break
-        
-        if not question_key:
-            # 일반적인 결혼 관련 질문으로 처리
-            question_key = "결혼은 언제 하니?"
-        
-        # 답변 생성
-        response_text = get_response(question_key, style)
-        
-        # 결과 반환
-        result = {
-            "question": question,
-            "matched_question": question_key,
-            "category": "결혼 관련",
-            "style": RESPONSE_STYLES[style],
-            "response": response_text,
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "disclaimer": "⚠️ 이 답변은 유머를 위한 것입니다. 실제 상황과 가족 관계를 고려해서 적절히 사용하세요."
-        }
-        
-        return result
-        
-    except Exception as e:
-        return {
-            "error": "시스템 오류",
-            "message": f"예상치 못한 오류가 발생했습니다: {str(e)}",
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        }
+    return pipeline.run(RequestContext(
+        tool="generate_marriage_response",
+        question=question,
+        styles=[style],
+        category="marriage",
+        corpus_id=corpus,
+        seed=seed,
+        envelope=marriage_envelope
+    ))
 
 @mcp.tool
+@admission.guard("generate_response")
 def generate_response(
     question: str,
     style: str = "humorous",
-    category: str = "auto"
+    category: str = "auto",
+    corpus: str = DEFAULT_CORPUS,
+    seed: Optional[int] = None
 ) -> Dict[str, Any]:
     """명절 질문에 대한 답변을 생성합니다 (모든 카테고리 지원).
     
@@ -137,98 +419,56 @@ def generate_response(
         style: 답변 스타일 (humorous, witty, polite, reverse, wise)
         category: 질문 카테고리 (auto, marriage, childbirth, job, study, appearance, age)
                  auto로 설정시 자동 감지
+        corpus: 사용할 답변 코퍼스 ID (기본값: default)
+        seed: 지정하면 같은 요청에 항상 같은 답변을 반환 (선택)
     
     Returns:
         dict: 답변 정보
     """
-    try:
-        # 입력 검증
-        if style not in RESPONSE_STYLES:
-            return {
-                "error": "입력 오류",
-                "message": f"지원하지 않는 스타일입니다. 사용 가능: {', '.join(RESPONSE_STYLES.keys())}",
-                "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-        
-        # 카테고리 자동 감지 또는 수동 설정
-        if category == "auto":
-            detected_category = detect_category(question)
-        else:
-            if category not in QUESTION_CATEGORIES:
-                return {
-                    "error": "입력 오류",
-                    "message": f"지원하지 않는 카테고리입니다. 사용 가능: {', '.join(QUESTION_CATEGORIES.keys())}",
-                    "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-                }
-            detected_category = category
-        
-        # 질문 매칭
-        question_key = None
-        category_responses = ALL_RESPONSES.get(detected_category, {})
-        
-        for key in category_responses.keys():
-            if key in question or question in key:
-                question_key = key
-                break
-        
-        if not question_key:
-            # 해당 카테고리의 첫 번째 질문으로 처리
-            question_key = list(category_responses.keys())[0] if category_responses else None
-        
-        if not question_key:
-            return {
-                "error": "답변 생성 실패",
-                "message": "적절한 답변을 찾을 수 없습니다.",
-                "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-        
-        # 답변 생성
-        response_text = get_all_response(detected_category, question_key, style)
-        
-        # 결과 반환
-        result = {
-            "question": question,
-            "matched_question": question_key,
-            "category": QUESTION_CATEGORIES[detected_category],
-            "category_key": detected_category,
-            "style": RESPONSE_STYLES[style],
-            "style_key": style,
-            "response": response_text,
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "disclaimer": "⚠️ 이 답변은 유머를 위한 것입니다. 실제 상황과 가족 관계를 고려해서 적절히 사용하세요."
-        }
-        
-        return result
-        
-    except Exception as e:
-        return {
-            "error": "시스템 오류",
-            "message": f"예상치 못한 오류가 발생했습니다: {str(e)}",
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        }
+    return pipeline.run(RequestContext(
+        tool="generate_response",
+        question=question,
+        styles=[style],
+        category=category,
+        corpus_id=corpus,
+        seed=seed,
+        envelope=response_envelope
+    ))
 
 @mcp.tool
-def list_categories() -> Dict[str, Any]:
+@admission.guard("list_categories")
+def list_categories(corpus: str = DEFAULT_CORPUS) -> Dict[str, Any]:
     """사용 가능한 모든 질문 카테고리를 조회합니다.
     
+    Args:
+        corpus: 조회할 답변 코퍼스 ID (기본값: default)
+    
     Returns:
         dict: 카테고리 목록 및 설명
     """
+    is_valid, error_msg = validate_corpus(corpus)
+    if not is_valid:
+        return error_response("입력 오류", error_msg)
+    categories = corpus_registry.get(corpus).categories
+    
     return {
-        "categories": QUESTION_CATEGORIES,
+        "categories": categories,
         "styles": RESPONSE_STYLES,
-        "total_categories": len(QUESTION_CATEGORIES),
+        "total_categories": len(categories),
         "total_styles": len(RESPONSE_STYLES),
         "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
     }
 
 @mcp.tool
+@admission.guard("generate_custom_response")
 def generate_custom_response(
     question: str,
     style: str = "humorous",
     age: int = None,
     job: str = None,
-    married: bool = False
+    married: bool = False,
+    corpus: str = DEFAULT_CORPUS,
+    seed: Optional[int] = None
 ) -> Dict[str, Any]:
     """사용자 상황을 반영한 맞춤형 답변을 생성합니다.
     
@@ -238,160 +478,79 @@ def generate_custom_response(
         age: 사용자 나이 (선택)
         job: 사용자 직업 (선택: 학생, 취준생, 직장인, 프리랜서 등)
         married: 결혼 여부 (선택)
+        corpus: 사용할 답변 코퍼스 ID (기본값: default)
+        seed: 지정하면 같은 요청에 항상 같은 답변을 반환 (선택)
     
     Returns:
         dict: 맞춤형 답변 정보
     """
-    try:
-        # 카테고리 감지
-        detected_category = detect_category(question)
-        
-        # 질문 매칭
-        question_key = None
-        category_responses = ALL_RESPONSES.get(detected_category, {})
-        
-        for key in category_responses.keys():
-            if key in question or question in key:
-                question_key = key
-                break
-        
-        if not question_key:
-            question_key = list(category_responses.keys())[0] if category_responses else None
-        
-        if not question_key:
-            return {
-                "error": "답변 생성 실패",
-                "message": "적절한 답변을 찾을 수 없습니다.",
-                "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-        
-        # 기본 답변 생성
-        response_text = get_all_response(detected_category, question_key, style)
-        
-        # 사용자 상황 반영
-        user_situation = {}
-        if age:
-            user_situation["age"] = age
-        if job:
-            user_situation["job"] = job
-        if married:
-            user_situation["married"] = married
-        
-        if user_situation:
-            response_text = customize_response(response_text, user_situation)
-        
-        # 결과 반환
-        result = {
-            "question": question,
-            "matched_question": question_key,
-            "category": QUESTION_CATEGORIES[detected_category],
-            "style": RESPONSE_STYLES[style],
-            "response": response_text,
-            "user_situation": user_situation if user_situation else "상황 정보 미제공",
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "disclaimer": "⚠️ 이 답변은 유머를 위한 것입니다. 실제 상황과 가족 관계를 고려해서 적절히 사용하세요."
-        }
-        
-        return result
-        
-    except Exception as e:
-        return {
-            "error": "시스템 오류",
-            "message": f"예상치 못한 오류가 발생했습니다: {str(e)}",
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        }
+    # 사용자 상황 정리
+    user_situation = {}
+    if age:
+        user_situation["age"] = age
+    if job:
+        user_situation["job"] = job
+    if married:
+        user_situation["married"] = married
+    
+    return pipeline.run(RequestContext(
+        tool="generate_custom_response",
+        question=question,
+        styles=[style],
+        corpus_id=corpus,
+        user_situation=user_situation,
+        seed=seed,
+        envelope=custom_envelope
+    ))
 
 @mcp.tool
+@admission.guard("generate_multiple_responses")
 def generate_multiple_responses(
     question: str,
-    styles: str = "humorous,witty,polite"
+    styles: str = "humorous,witty,polite",
+    corpus: str = DEFAULT_CORPUS,
+    seed: Optional[int] = None
 ) -> Dict[str, Any]:
     """한 질문에 대해 여러 스타일의 답변을 한 번에 생성합니다.
     
     Args:
         question: 친척이 한 질문
         styles: 쉼표로 구분된 스타일 목록 (예: "humorous,witty,polite")
+        corpus: 사용할 답변 코퍼스 ID (기본값: default)
+        seed: 지정하면 같은 요청에 항상 같은 답변을 반환 (선택)
     
     Returns:
         dict: 여러 스타일의 답변들
     """
-    try:
-        # 스타일 파싱
-        style_list = [s.strip() for s in styles.split(',')]
-        
-        # 유효성 검증
-        invalid_styles = [s for s in style_list if s not in RESPONSE_STYLES]
-        if invalid_styles:
-            return {
-                "error": "입력 오류",
-                "message": f"지원하지 않는 스타일: {', '.join(invalid_styles)}",
-                "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-        
-        # 카테고리 감지
-        detected_category = detect_category(question)
-        
-        # 질문 매칭
-        question_key = None
-        category_responses = ALL_RESPONSES.get(detected_category, {})
-        
-        for key in category_responses.keys():
-            if key in question or question in key:
-                question_key = key
-                break
-        
-        if not question_key:
-            question_key = list(category_responses.keys())[0] if category_responses else None
-        
-        if not question_key:
-            return {
-                "error": "답변 생성 실패",
-                "message": "적절한 답변을 찾을 수 없습니다.",
-                "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-        
-        # 각 스타일별 답변 생성
-        responses = []
-        for style in style_list:
-            response_text = get_all_response(detected_category, question_key, style)
-            responses.append({
-                "style": RESPONSE_STYLES[style],
-                "style_key": style,
-                "response": response_text
-            })
-        
-        # 유사 질문 추천
-        similar_questions = get_similar_questions(detected_category, question_key)
-        
-        # 결과 반환
-        result = {
-            "question": question,
-            "matched_question": question_key,
-            "category": QUESTION_CATEGORIES[detected_category],
-            "responses": responses,
-            "similar_questions": similar_questions,
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "disclaimer": "⚠️ 이 답변들은 유머를 위한 것입니다. 실제 상황과 가족 관계를 고려해서 적절히 사용하세요."
-        }
-        
-        return result
-        
-    except Exception as e:
-        return {
-            "error": "시스템 오류",
-            "message": f"예상치 못한 오류가 발생했습니다: {str(e)}",
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        }
+    # 스타일 파싱
+    style_list = [s.strip() for s in styles.split(',')]
+    
+    return pipeline.run(RequestContext(
+        tool="generate_multiple_responses",
+        question=question,
+        styles=style_list,
+        corpus_id=corpus,
+        seed=seed,
+        envelope=multiple_envelope
+    ))
 
 @mcp.tool
-def get_question_examples() -> Dict[str, Any]:
+@admission.guard("get_question_examples")
+def get_question_examples(corpus: str = DEFAULT_CORPUS) -> Dict[str, Any]:
     """각 카테고리별 예시 질문을 조회합니다.
     
+    Args:
+        corpus: 조회할 답변 코퍼스 ID (기본값: default)
+    
     Returns:
         dict: 카테고리별 예시 질문 목록
     """
     try:
-        examples = get_all_question_examples()
+        is_valid, error_msg = validate_corpus(corpus)
+        if not is_valid:
+            return error_response("입력 오류", error_msg)
+        active_corpus = corpus_registry.get(corpus)
+        examples = active_corpus.get_question_examples()
         
         result = {
             "categories": {},
@@ -400,7 +559,7 @@ def get_question_examples() -> Dict[str, Any]:
         }
         
         for category, questions in examples.items():
-            result["categories"][QUESTION_CATEGORIES[category]] = {
+            result["categories"][active_corpus.categories.get(category, category)] = {
                 "category_key": category,
                 "questions": questions,
                 "count": len(questions)
@@ -410,12 +569,122 @@ def get_question_examples() -> Dict[str, Any]:
         return result
         
     except Exception as e:
-        return {
-            "error": "시스템 오류",
-            "message": f"예상치 못한 오류가 발생했습니다: {str(e)}",
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-        }
+        return error_response("시스템 오류", f"예상치 못한 오류가 발생했습니다: {str(e)}")
+
+@mcp.tool
+def get_server_stats() -> Dict[str, Any]:
+    """서버 캐시 상태, 수락 제어/로깅/파이프라인 단계 지표와 인기 질문 통계를 조회합니다.
+    
+    Returns:
+        dict: 웜 캐시 통계, 도구별 대기열/거절 지표, 로그 큐 지표, 단계별 소요 시간, 요청 병합 비율, 섀도 비교 결과 및 인기 질문 목록
+    """
+    return {
+        "warm_cache": warm_cache.stats(),
+        "admission": admission.stats(),
+        "logging": log_pipeline.stats(),
+        "pipeline": pipeline.stats(),
+        "single_flight": resolution_flight.stats(),
+        "shadow": shadow.stats(),
+        "response_cache": response_cache.stats(),
+        "popular_questions": warm_cache.most_popular(),
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    }
+
+@mcp.tool
+def list_corpora() -> Dict[str, Any]:
+    """등록된 답변 코퍼스와 코퍼스별 메모리 사용량, 로드 시간을 조회합니다.
+    
+    Returns:
+        dict: 코퍼스 목록, 메모리 사용량/예산, 축출 횟수
+    """
+    result = corpus_registry.stats()
+    result["default_corpus"] = DEFAULT_CORPUS
+    result["timestamp"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    return result
+
+# HTTP 엔드포인트 (HTTP 전송 방식에서만 사용)
+@mcp.custom_route("/api/response", methods=["GET"])
+async def http_generate_response(request: Request) -> Response:
+    """generate_response의 HTTP GET 버전 (seed가 있으면 ETag/304로 재사용 가능)"""
+    params = request.query_params
+    question = params.get("question", "")
+    style = params.get("style", "humorous")
+    category = params.get("category", "auto")
+    corpus = params.get("corpus", DEFAULT_CORPUS)
+    try:
+        seed = int(params["seed"]) if "seed" in params else None
+    except ValueError:
+        return JSONResponse(error_response("입력 오류", "seed는 정수여야 합니다."), status_code=400)
+    
+    # 캐시된 결과와 ETag가 같으면 파이프라인을 실행하지 않고 304 응답
+    # (이벤트 루프에서 코퍼스를 로드하지 않도록 이미 로드된 코퍼스일 때만 확인)
+    if_none_match = request.headers.get("if-none-match")
+    loaded = corpus_registry.loaded().get(corpus) if seed is not None and if_none_match else None
+    if loaded is not None:
+        key = make_key("generate_response", loaded.version, sanitize_input(question),
+                       [style], category, {}, seed)
+        etag = response_cache.etag_for(key)
+        if etag and etag_matches(if_none_match, etag):
+            response_cache.record_not_modified()
+            return Response(status_code=304, headers={
+                "ETag": etag,
+                "Cache-Control": f"public, max-age={RESPONSE_CACHE_MAX_AGE}"
+            })
+    
+    result = await generate_response.fn(question=question, style=style, category=category, corpus=corpus, seed=seed)
+    if "error" in result:
+        status_code = {"입력 오류": 400, "서버 혼잡": 503}.get(result["error"], 500)
+        return JSONResponse(result, status_code=status_code, headers={"Cache-Control": "no-store"})
+    if seed is None:
+        return JSONResponse(result, headers={"Cache-Control": "no-store"})
+    return JSONResponse(result, headers={
+        "ETag": result["etag"],
+        "Cache-Control": f"public, max-age={RESPONSE_CACHE_MAX_AGE}"
+    })
+
+def memory_report(include_projection: bool = True) -> Dict[str, Any]:
+    """로드된 코퍼스와 서버 파생 구조의 메모리 리포트 생성 (구조는 각 소유자의 잠금 안에서 복사)"""
+    structures = {f"warm_cache.{name}": table for name, table in warm_cache.snapshot_tables().items()}
+    # LogRecord는 속성 사전을 따라가야 메시지/추가 필드 크기가 잡힘
+    structures["log_queue"] = [vars(record) for record in log_pipeline.queued_records()]
+    structures["response_cache"] = response_cache.snapshot_entries()
+    structures["shadow.candidates"] = {
+        version: vars(candidate) for version, candidate in shadow.candidates().items()
+    }
+    return build_memory_report(
+        corpus_registry.loaded(),
+        structures,
+        list(RESPONSE_STYLES.keys()),
+        include_projection=include_projection
+    )
+
+@mcp.tool
+@admission.guard("get_memory_report")
+def get_memory_report(include_projection: bool = False) -> Dict[str, Any]:
+    """카테고리/인덱스/캐시별 메모리 사용량과 코퍼스 크기별 메모리 증가 추정을 조회합니다.
+    
+    Args:
+        include_projection: 합성 코퍼스로 성장 추정을 포함할지 여부 (기본값: False, 수 초 걸릴 수 있음)
+    
+    Returns:
+        dict: 코퍼스별 카테고리/인덱스 바이트, 캐시 바이트, 인터프리터 기본 사용량, 성장 추정
+    """
+    try:
+        result = memory_report(include_projection)
+        result["timestamp"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        return result
+    except Exception as e:
+        return error_response("시스템 오류", f"예상치 못한 오류가 발생했습니다: {str(e)}")
 
 # 서버 실행
 if __name__ == "__main__":
-    mcp.run()
+    parser = argparse.ArgumentParser(description="명절 질문 답변 생성기 MCP 서버")
+    parser.add_argument("--memory-report", action="store_true", help="메모리 사용량 리포트를 JSON으로 출력하고 종료")
+    parser.add_argument("--no-projection", action="store_true", help="메모리 리포트에서 성장 추정 생략")
+    args = parser.parse_args()
+    
+    if args.memory_report:
+        corpus_registry.get(DEFAULT_CORPUS)
+        print(json.dumps(memory_report(not args.no_projection), ensure_ascii=False, indent=2))
+    else:
+        mcp.run()
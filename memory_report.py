@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+메모리 사용량 리포트
+카테고리별 답변 데이터, 파생 인덱스/캐시, 인터프리터 기본 사용량을 측정하고
+합성 코퍼스로 코퍼스 크기에 따른 메모리 증가를 추정합니다.
+"""
+
+import os
+import sys
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from corpora import Corpus, deep_sizeof
+
+# 성장 추정에 사용할 합성 코퍼스 크기 (질문 수)
+SYNTHETIC_SIZES = (200, 1000, 5000)
+# 추정 결과를 보여줄 코퍼스 크기 (질문 수)
+PROJECTION_SIZES = (10000, 50000, 100000)
+
+
+def process_rss_bytes() -> Optional[int]:
+    """현재 프로세스 RSS (Linux /proc 기준, 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 바이트, Linux는 KB 단위
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def category_report(corpus: Corpus, seen: Optional[set] = None) -> Dict[str, Any]:
+    """카테고리별 답변 데이터 크기 (seen에 있는 객체는 다시 세지 않음)"""
+    report = {}
+    for category, questions in corpus.responses.items():
+        answers = sum(len(items) for styles in questions.values() for items in styles.values())
+        report[category] = {
+            "bytes": deep_sizeof(questions, seen),
+            "questions": len(questions),
+            "answers": answers
+        }
+    return report
+
+
+def structures_report(structures: Dict[str, Any], seen: Optional[set] = None) -> Dict[str, int]:
+    """이름별 파생 구조(인덱스/캐시) 크기 (seen에 있는 객체는 다시 세지 않음)"""
+    return {name: deep_sizeof(obj, seen) for name, obj in structures.items()}
+
+
+def tracemalloc_report(top: int = 10) -> Dict[str, Any]:
+    """tracemalloc이 켜져 있으면 추적 메모리와 파일별 상위 할당 반환"""
+    if not tracemalloc.is_tracing():
+        return {
+            "tracing": False,
+            "note": "HOLIDAY_TRACEMALLOC=1 또는 --memory-report로 시작하면 시작 시점부터 추적합니다."
+        }
+    current, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().statistics("filename")
+    return {
+        "tracing": True,
+        "traced_bytes": current,
+        "traced_peak_bytes": peak,
+        "top_files": [
+            {"file": os.path.basename(stat.traceback[0].filename), "bytes": stat.size, "blocks": stat.count}
+            for stat in stats[:top]
+        ]
+    }
+
+
+def synthetic_responses(questions: int, styles: List[str], answers_per_style: int = 3,
+                        categories: int = 6, answer_length: int = 40) -> Dict[str, Any]:
+    """질문 수가 주어진 합성 코퍼스 생성 (모든 문자열은 고유)"""
+    responses: Dict[str, Any] = {}
+    filler = "가" * answer_length
+    for i in range(questions):
+        category = f"category{i % categories}"
+        responses.setdefault(category, {})[f"합성 질문 {i}?"] = {
+            style: [f"{filler} {i}-{style}-{n}" for n in range(answers_per_style)]
+            for style in styles
+        }
+    return responses
+
+
+def growth_projection(styles: List[str], sizes=SYNTHETIC_SIZES, targets=PROJECTION_SIZES) -> Dict[str, Any]:
+    """합성 코퍼스 크기별 측정값으로 질문당 바이트를 선형 추정
+
+    tracemalloc은 직접 켜지 않습니다. 이미 추적 중이면 실제 할당량으로, 아니면
+    deep_sizeof 값으로 추정합니다.
+    """
+    tracing = tracemalloc.is_tracing()
+    samples = []
+    for size in sizes:
+        before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        corpus = Corpus(f"synthetic-{size}", synthetic_responses(size, styles))
+        after = tracemalloc.get_traced_memory()[0] if tracing else 0
+        samples.append({
+            "questions": size,
+            "deep_size_bytes": corpus.size_bytes,
+            "traced_bytes": after - before if tracing else None
+        })
+        del corpus
+
+    # 최소제곱 직선: bytes = fixed + per_question * questions
+    measure = "traced_bytes" if tracing else "deep_size_bytes"
+    n = len(samples)
+    xs = [s["questions"] for s in samples]
+    ys = [s[measure] for s in samples]
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    per_question = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x if var_x else 0.0
+    fixed = max(0.0, mean_y - per_question * mean_x)
+
+    return {
+        "samples": samples,
+        "measure": measure,
+        "bytes_per_question": round(per_question, 1),
+        "fixed_bytes": round(fixed),
+        "projection": [
+            {"questions": target, "estimated_bytes": round(fixed + per_question * target)}
+            for target in targets
+        ]
+    }
+
+
+def build_memory_report(corpora: Dict[str, Corpus], structures: Dict[str, Any],
+                        styles: List[str], include_projection: bool = True) -> Dict[str, Any]:
+    """코퍼스별 카테고리 크기, 파생 구조 크기, 인터프리터 기본 사용량, 성장 추정을 묶은 리포트
+
+    리포트 전체가 하나의 seen 집합을 공유하므로, 캐시가 코퍼스와 공유하는 문자열
+    (질문 키 등)은 먼저 측정한 코퍼스 쪽에만 한 번 계산됩니다.
+    """
+    seen: set = set()
+    corpus_reports = {}
+    data_bytes = 0
+    for corpus_id, corpus in corpora.items():
+        categories = category_report(corpus, seen)
+        indexes = structures_report({
+            "categories": corpus.categories,
+            "keywords": corpus.keywords,
+            "question_keys": corpus.question_keys
+        }, seen)
+        measured = sum(item["bytes"] for item in categories.values()) + sum(indexes.values())
+        corpus_reports[corpus_id] = {
+            "version": corpus.version,
+            "total_bytes": measured,
+            "categories": categories,
+            "indexes": indexes
+        }
+        data_bytes += measured
+
+    derived = structures_report(structures, seen)
+    traced = tracemalloc_report()
+    rss = process_rss_bytes()
+    accounted = data_bytes + sum(derived.values())
+
+    report = {
+        "corpora": corpus_reports,
+        "structures": derived,
+        "interpreter": {
+            "rss_bytes": rss,
+            "accounted_bytes": accounted,
+            # 코퍼스/캐시 외에 인터프리터, 라이브러리, 서버가 차지하는 양
+            "baseline_bytes": rss - accounted if rss is not None else None,
+            "python_version": sys.version.split()[0]
+        },
+        "tracemalloc": traced
+    }
+    if include_projection:
+        report["growth"] = growth_projection(styles)
+    return report
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+단계별 요청 파이프라인
+모든 답변 생성 도구가 sanitize → validate → detect → match → select →
+customize → envelope 단계를 공유하며, 단계마다 시간 측정 훅과
+단계를 건너뛰는 캐시 지점을 둘 수 있습니다.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 모든 단계가 끝난 뒤 훅에 전달되는 단계 이름 (소요 시간은 파이프라인 전체)
+DONE = "done"
+
+
+class RequestContext:
+    """한 번의 도구 호출이 파이프라인을 지나며 채워지는 상태"""
+
+    def __init__(self, tool: str, question: str, styles: List[str],
+                 envelope: Callable[["RequestContext"], Dict[str, Any]],
+                 category: str = "auto", corpus_id: str = "default",
+                 user_situation: Optional[Dict[str, Any]] = None,
+                 seed: Optional[int] = None):
+        self.tool = tool
+        self.question = question
+        self.styles = styles
+        self.envelope = envelope
+        self.category = category
+        self.corpus_id = corpus_id
+        self.user_situation = user_situation or {}
+        self.seed = seed
+        # 단계 실행 중 채워지는 값
+        self.corpus = None
+        self.detected_category: Optional[str] = None
+        self.question_key: Optional[str] = None
+        self.responses: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Dict[str, Any]] = None
+        self.timings: Dict[str, float] = {}
+        self.cache_hits: List[str] = []
+
+    def fail(self, error: str, message: str) -> None:
+        """오류 응답을 설정하고 이후 단계를 중단"""
+        self.error = error_response(error, message)
+
+
+class StageCache:
+    """단계 단축 지점: lookup이 True를 반환하면 해당 단계를 건너뜀"""
+
+    def __init__(self, lookup: Callable[[RequestContext], bool],
+                 store: Optional[Callable[[RequestContext], None]] = None):
+        self.lookup = lookup
+        self.store = store
+
+
+class _FlightGroup:
+    def __init__(self, first: str, last: str, key: Callable[[RequestContext], Any],
+                 share: Tuple[str, ...], flight):
+        self.first = first
+        self.last = last
+        self.key = key
+        self.share = share
+        self.flight = flight
+
+
+class _StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class Pipeline:
+    """이름 있는 단계 목록을 순서대로 실행하는 요청 파이프라인"""
+
+    def __init__(self, stages: List[Tuple[str, Callable[[RequestContext], None]]]):
+        self._stages = list(stages)
+        self._caches: Dict[str, StageCache] = {}
+        self._hooks: List[Callable[[str, RequestContext, float], None]] = []
+        self._flights: Dict[str, _FlightGroup] = {}
+        self._stats: Dict[str, _StageStats] = {name: _StageStats() for name, _ in self._stages}
+        self._lock = threading.Lock()
+        self.hook_errors = 0
+
+    def insert_stage(self, after: str, name: str, fn: Callable[[RequestContext], None]) -> None:
+        """after 단계 바로 뒤에 새 단계 추가"""
+        for i, (stage_name, _) in enumerate(self._stages):
+            if stage_name == after:
+                self._stages.insert(i + 1, (name, fn))
+                with self._lock:
+                    self._stats.setdefault(name, _StageStats())
+                return
+        raise KeyError(after)
+
+    def set_cache(self, name: str, cache: StageCache) -> None:
+        """단계 앞에 단축 캐시 지점 등록"""
+        self._caches[name] = cache
+
+    def add_hook(self, hook: Callable[[str, RequestContext, float], None]) -> None:
+        """단계 종료마다 (단계 이름, 컨텍스트, 소요 초)로 호출되는 훅 등록
+
+        파이프라인이 끝나면(오류 포함) 단계 이름 DONE과 전체 소요 시간으로 한 번 더 호출됩니다.
+        훅에서 난 예외는 기록만 하고 삼키므로 요청 결과에 영향을 주지 않습니다.
+        """
+        self._hooks.append(hook)
+
+    def coalesce(self, first: str, last: str, key: Callable[[RequestContext], Any],
+                 share: Tuple[str, ...], flight) -> None:
+        """first~last 단계를 단일 실행 구간으로 등록
+
+        key(ctx)가 같은 요청이 동시에 구간에 들어오면 한 요청만 단계를 실행하고,
+        나머지는 share에 나열된 컨텍스트 필드를 복사받습니다.
+        """
+        names = [stage_name for stage_name, _ in self._stages]
+        if names.index(first) > names.index(last):
+            raise ValueError(f"{first} 단계가 {last} 단계보다 뒤에 있습니다")
+        self._flights[first] = _FlightGroup(first, last, key, share, flight)
+
+    def run(self, ctx: RequestContext) -> Dict[str, Any]:
+        """모든 단계 실행 후 결과 또는 오류 응답 반환
+
+        단계가 오류를 설정하거나 결과를 미리 채우면(캐시 적중) 이후 단계는 생략됩니다.
+        """
+        started = time.perf_counter()
+        try:
+            i = 0
+            while i < len(self._stages):
+                if ctx.error is not None or ctx.result is not None:
+                    break
+                name, fn = self._stages[i]
+                group = self._flights.get(name)
+                if group is not None:
+                    i = self._run_coalesced(group, i, ctx)
+                    continue
+                self._run_stage(name, fn, ctx)
+                i += 1
+        except Exception as e:
+            ctx.error = error_response("시스템 오류", f"예상치 못한 오류가 발생했습니다: {str(e)}")
+        self._call_hooks(DONE, ctx, time.perf_counter() - started)
+        return ctx.error if ctx.error is not None else ctx.result
+
+    def _run_stage(self, name: str, fn: Callable[[RequestContext], None], ctx: RequestContext) -> None:
+        started = time.perf_counter()
+        cache = self._caches.get(name)
+        hit = cache is not None and cache.lookup(ctx)
+        if hit:
+            ctx.cache_hits.append(name)
+        else:
+            fn(ctx)
+            if cache is not None and cache.store is not None and ctx.error is None:
+                cache.store(ctx)
+        elapsed = time.perf_counter() - started
+        ctx.timings[name] = elapsed
+        self._record(name, elapsed, hit)
+        self._call_hooks(name, ctx, elapsed)
+
+    def _call_hooks(self, name: str, ctx: RequestContext, elapsed: float) -> None:
+        for hook in self._hooks:
+            try:
+                hook(name, ctx, elapsed)
+            except Exception as e:
+                with self._lock:
+                    self.hook_errors += 1
+                logger.warning(f"파이프라인 훅 오류 ({name}): {e}")
+
+    def _run_coalesced(self, group: _FlightGroup, start: int, ctx: RequestContext) -> int:
+        """단일 실행 구간을 실행하고 구간 다음 단계 위치 반환"""
+        end = start
+        while self._stages[end][0] != group.last:
+            end += 1
+        stages = self._stages[start:end + 1]
+
+        def execute() -> Dict[str, Any]:
+            for name, fn in stages:
+                if ctx.error is not None or ctx.result is not None:
+                    break
+                self._run_stage(name, fn, ctx)
+            return {field: getattr(ctx, field) for field in group.share}
+
+        started = time.perf_counter()
+        shared, coalesced = group.flight.do(group.key(ctx), execute)
+        if coalesced:
+            # 다른 요청의 결과를 기다린 시간만 기록 (단계 통계에는 넣지 않음)
+            for field, value in shared.items():
+                setattr(ctx, field, value)
+            ctx.timings["coalesced_wait"] = time.perf_counter() - started
+        return end + 1
+
+    def _record(self, name: str, elapsed: float, hit: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, _StageStats())
+            stats.calls += 1
+            stats.cache_hits += int(hit)
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "stages": {
+                    name: {
+                        "calls": stats.calls,
+                        "cache_hits": stats.cache_hits,
+                        "avg_ms": round(stats.total / stats.calls * 1000, 4) if stats.calls else 0.0,
+                        "max_ms": round(stats.max * 1000, 4)
+                    }
+                    for name, stats in self._stats.items()
+                },
+                "hook_errors": self.hook_errors
+            }
+
+
+def error_response(error: str, message: str) -> Dict[str, Any]:
+    """도구 공통 오류 응답"""
+    return {
+        "error": error,
+        "message": message,
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    }
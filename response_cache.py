@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시드 고정 응답 캐시
+seed가 주어진 요청은 (도구, 코퍼스 버전, 질문, 스타일, 카테고리, 사용자 상황, 시드)의
+순수 함수이므로 결과를 캐시하고 ETag로 재사용할 수 있습니다.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# ETag 계산에서 제외하는 필드 (요청마다 달라지는 값)
+VOLATILE_FIELDS = ("timestamp", "etag")
+
+
+def make_key(tool: str, corpus_version: str, question: str, styles: List[str],
+             category: str, user_situation: Dict[str, Any], seed: int) -> Tuple:
+    """응답 캐시 키"""
+    situation = json.dumps(user_situation, ensure_ascii=False, sort_keys=True)
+    return (tool, corpus_version, question, tuple(styles), category, situation, seed)
+
+
+def compute_etag(result: Dict[str, Any]) -> str:
+    """요청마다 달라지는 필드를 제외한 결과 내용의 약한 ETag
+
+    timestamp는 응답마다 바뀌어 바이트 단위로 같지 않으므로 약한 검증자(W/)를 씁니다.
+    """
+    body = {k: v for k, v in result.items() if k not in VOLATILE_FIELDS}
+    encoded = json.dumps(body, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return 'W/"' + hashlib.sha256(encoded).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더가 ETag와 약한 비교로 일치하는지 확인"""
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
+class ResponseCache:
+    """시드 고정 응답 LRU 캐시
+
+    결과와 함께 (감지된 카테고리, 매칭 질문 키)를 저장해 캐시 적중 시에도 인기 질문 집계와
+    로그에 쓸 수 있게 합니다. 호출자가 결과를 고쳐도 캐시가 오염되지 않도록 저장할 때와
+    꺼낼 때 모두 사본을 씁니다.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[Dict[str, Any], Tuple[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Tuple) -> Optional[Tuple[Dict[str, Any], Tuple[str, str]]]:
+        """(결과 사본, (카테고리, 질문 키)) 또는 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        result, resolution = entry
+        return copy.deepcopy(result), resolution
+
+    def put(self, key: Tuple, result: Dict[str, Any], resolution: Tuple[str, str]) -> None:
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._entries[key] = (result, resolution)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def etag_for(self, key: Tuple) -> Optional[str]:
+        """캐시된 결과의 ETag (파이프라인 실행 없이 조건부 요청 처리용)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0].get("etag") if entry is not None else None
+
+    def snapshot_entries(self) -> "OrderedDict[Tuple, Tuple[Dict[str, Any], Tuple[str, str]]]":
+        """메모리 측정용 항목 사본 (잠금 안에서 복사)"""
+        with self._lock:
+            return OrderedDict(self._entries)
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified
+            }
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+섀도 모드 매칭 비교
+샘플링된 실제 호출에 대해 후보 감지/매칭 엔진을 백그라운드에서 함께 실행하고
+기존 결과와의 일치율, 불일치 질문 샘플, 단계별 지연 시간 차이를 기록합니다.
+사용자에게는 항상 기존 결과가 반환됩니다.
+"""
+
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from corpora import Corpus
+
+
+class IndexedMatcher:
+    """미리 만든 인덱스로 감지/매칭하는 후보 엔진
+
+    감지: 모든 키워드를 한 정규식으로 묶어 질문을 한 번만 훑고, 발견된 키워드 중
+    카테고리 우선순위가 가장 높은 것을 고릅니다.
+    매칭: 질문 키와 정확히 같으면 해시 조회로 끝내고, 아니면 부분 문자열 검색으로 넘어갑니다.
+    """
+
+    def __init__(self, corpus: Corpus):
+        self.default_category = corpus.default_category
+        self._priority: Dict[str, int] = {}
+        words: List[Tuple[int, str]] = []
+        for rank, (category, keywords) in enumerate(corpus.keywords.items()):
+            for word in keywords:
+                if word not in self._priority:
+                    self._priority[word] = rank
+                    words.append((rank, word))
+        self._categories = list(corpus.keywords)
+        # 같은 위치에서 시작하는 키워드는 우선순위 높은 것이 먼저 잡히도록 정렬
+        alternatives = "|".join(re.escape(word) for _, word in sorted(words))
+        self._pattern = re.compile(f"(?=({alternatives}))") if words else None
+        self._keys = {category: list(questions) for category, questions in corpus.responses.items()}
+        self._key_sets = {category: set(keys) for category, keys in self._keys.items()}
+
+    def detect(self, question: str) -> str:
+        if self._pattern is None:
+            return self.default_category
+        best = None
+        for found in self._pattern.finditer(question):
+            rank = self._priority[found.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self._categories[best] if best is not None else self.default_category
+
+    def match(self, category: str, question: str) -> Optional[str]:
+        if question in self._key_sets.get(category, ()):
+            return question
+        keys = self._keys.get(category, [])
+        for key in keys:
+            if key in question or question in key:
+                return key
+        return keys[0] if keys else None
+
+
+class _Latency:
+    def __init__(self):
+        self.count = 0
+        self.legacy = 0.0
+        self.candidate = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        if not self.count:
+            return {"samples": 0, "legacy_avg_ms": 0.0, "candidate_avg_ms": 0.0, "diff_avg_ms": 0.0}
+        legacy = self.legacy / self.count * 1000
+        candidate = self.candidate / self.count * 1000
+        return {
+            "samples": self.count,
+            "legacy_avg_ms": round(legacy, 4),
+            "candidate_avg_ms": round(candidate, 4),
+            # 음수면 후보 엔진이 더 빠름
+            "diff_avg_ms": round(candidate - legacy, 4)
+        }
+
+
+class ShadowRunner:
+    """샘플링된 호출을 백그라운드 스레드에서 후보 엔진과 비교
+
+    후보 엔진 인덱스는 코퍼스 버전별로 최근 max_candidates개만 유지합니다.
+    """
+
+    def __init__(self, legacy_detect: Callable[[Corpus, str], str],
+                 legacy_match: Callable[[Corpus, str, str], Optional[str]],
+                 candidate_factory: Callable[[Corpus], Any] = IndexedMatcher,
+                 sample_rate: float = 0.0, max_pending: int = 100, max_samples: int = 50,
+                 max_candidates: int = 8):
+        self.legacy_detect = legacy_detect
+        self.legacy_match = legacy_match
+        self.candidate_factory = candidate_factory
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.max_candidates = max_candidates
+        self._candidates: "OrderedDict[str, Any]" = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.sampled = 0
+        self.dropped = 0
+        self.compared = 0
+        self.failed = 0
+        self.detect_agreed = 0
+        self.detect_compared = 0
+        self.match_agreed = 0
+        self.agreed = 0
+        self.disagreements: deque = deque(maxlen=max_samples)
+        self._latency = {"detect": _Latency(), "match": _Latency()}
+
+    def maybe_submit(self, corpus: Corpus, category: str, question: str,
+                     detected_category: str, question_key: str) -> bool:
+        """샘플에 뽑히면 비교 작업을 백그라운드에 넘기고 True 반환 (요청은 기다리지 않음)"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending += 1
+            self.sampled += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        try:
+            self._executor.submit(self._compare, corpus, category, question, detected_category, question_key)
+        except Exception:
+            # 종료 후 제출 등 실패는 요청에 영향을 주지 않고 집계만 함
+            with self._lock:
+                self._pending -= 1
+                self.sampled -= 1
+                self.failed += 1
+            return False
+        return True
+
+    def _candidate(self, corpus: Corpus):
+        with self._lock:
+            candidate = self._candidates.get(corpus.version)
+            if candidate is not None:
+                self._candidates.move_to_end(corpus.version)
+                return candidate
+        candidate = self.candidate_factory(corpus)
+        with self._lock:
+            self._candidates[corpus.version] = candidate
+            while len(self._candidates) > self.max_candidates:
+                self._candidates.popitem(last=False)
+        return candidate
+
+    def _compare(self, corpus: Corpus, category: str, question: str,
+                 detected_category: str, question_key: str) -> None:
+        try:
+            candidate = self._candidate(corpus)
+            auto = category == "auto"
+            if auto:
+                started = time.perf_counter()
+                self.legacy_detect(corpus, question)
+                legacy_detect = time.perf_counter() - started
+                started = time.perf_counter()
+                candidate_category = candidate.detect(question)
+                candidate_detect = time.perf_counter() - started
+            else:
+                candidate_category = category
+
+            started = time.perf_counter()
+            self.legacy_match(corpus, detected_category, question)
+            legacy_match = time.perf_counter() - started
+            # 매칭은 기존 감지 결과 기준으로 비교해 두 단계의 불일치를 따로 집계
+            started = time.perf_counter()
+            candidate_key = candidate.match(detected_category, question)
+            candidate_match = time.perf_counter() - started
+        except Exception:
+            with self._lock:
+                self.failed += 1
+                self._pending -= 1
+            return
+
+        detect_ok = candidate_category == detected_category
+        match_ok = candidate_key == question_key
+        with self._lock:
+            self._pending -= 1
+            self.compared += 1
+            if auto:
+                self.detect_compared += 1
+                self.detect_agreed += int(detect_ok)
+                self._record("detect", legacy_detect, candidate_detect)
+            self.match_agreed += int(match_ok)
+            self.agreed += int(detect_ok and match_ok)
+            self._record("match", legacy_match, candidate_match)
+            if not (detect_ok and match_ok):
+                self.disagreements.append({
+                    "corpus": corpus.corpus_id,
+                    "question": question,
+                    "category": category,
+                    "legacy": {"category": detected_category, "matched_question": question_key},
+                    "candidate": {"category": candidate_category, "matched_question": candidate_key}
+                })
+
+    def _record(self, stage: str, legacy: float, candidate: float) -> None:
+        latency = self._latency[stage]
+        latency.count += 1
+        latency.legacy += legacy
+        latency.candidate += candidate
+
+    def candidates(self) -> Dict[str, Any]:
+        """코퍼스 버전별 후보 엔진 인덱스 사본 (메모리 측정용)"""
+        with self._lock:
+            return dict(self._candidates)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "sampled": self.sampled,
+                "compared": self.compared,
+                "pending": self._pending,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "candidates": len(self._candidates),
+                "agreement_rate": round(self.agreed / self.compared, 4) if self.compared else None,
+                "detect_agreement_rate": (
+                    round(self.detect_agreed / self.detect_compared, 4) if self.detect_compared else None
+                ),
+                "match_agreement_rate": round(self.match_agreed / self.compared, 4) if self.compared else None,
+                "latency": {stage: latency.stats() for stage, latency in self._latency.items()},
+                "disagreements": list(self.disagreements)
+            }
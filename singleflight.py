@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+단일 실행(single-flight) 요청 병합
+같은 키로 동시에 들어온 계산은 한 번만 실행하고 결과를 대기자들과 공유합니다.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """키별 진행 중인 계산을 공유하는 스레드 안전 병합기
+
+    대기자는 wait_timeout초까지만 기다리고, 그 안에 실행자가 끝나지 않으면
+    직접 fn을 실행합니다 (멈춘 실행자가 대기자의 워커 스레드를 붙잡지 않도록).
+    """
+
+    def __init__(self, wait_timeout: Optional[float] = None):
+        self.wait_timeout = wait_timeout
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.wait_timeouts = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """fn 실행 결과와 다른 호출의 결과를 공유받았는지 여부 반환"""
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if call.done.wait(self.wait_timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.value, True
+            with self._lock:
+                self.coalesced -= 1
+                self.executions += 1
+                self.wait_timeouts += 1
+            return fn(), False
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "wait_timeouts": self.wait_timeouts,
+                "wait_timeout_ms": round(self.wait_timeout * 1000) if self.wait_timeout is not None else None,
+                "coalescing_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+                "in_flight": len(self._calls)
+            }
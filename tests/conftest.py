@@ -0,0 +1,17 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# 저장소 루트의 평면 모듈(main.py, pipeline.py 등)을 import할 수 있게 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def main():
+    """서버 모듈 (테스트 중에는 웜 캐시 스냅샷을 디스크에 쓰지 않음)"""
+    patch = pytest.MonkeyPatch()
+    patch.setenv("HOLIDAY_CACHE_PATH", "")
+    yield importlib.import_module("main")
+    patch.undo()
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+from admission import AdmissionController, parse_limits
+
+
+def make_blocking_tool(controller, name="tool"):
+    """release 이벤트가 설정될 때까지 워커 스레드에서 멈춰 있는 도구"""
+    release = threading.Event()
+    started = threading.Event()
+
+    @controller.guard(name)
+    def tool(value):
+        started.set()
+        release.wait(5)
+        return {"value": value}
+
+    return tool, started, release
+
+
+async def wait_for_event(event):
+    while not event.is_set():
+        await asyncio.sleep(0.001)
+
+
+def test_rejects_when_queue_full():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, max_queue=1, queue_timeout=5)
+        tool, started, release = make_blocking_tool(controller)
+        first = asyncio.ensure_future(tool(1))
+        await wait_for_event(started)
+        second = asyncio.ensure_future(tool(2))
+        await asyncio.sleep(0.01)
+        third = await tool(3)
+        release.set()
+        return third, await first, await second, controller.stats()["tools"]["tool"]
+
+    third, first, second, stats = asyncio.run(scenario())
+    assert third["error"] == "서버 혼잡"
+    assert "대기열" in third["message"]
+    assert first == {"value": 1}
+    assert second == {"value": 2}
+    assert stats["rejected_queue_full"] == 1
+    assert stats["active"] == 0
+
+
+def test_rejects_after_queue_timeout():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, max_queue=4, queue_timeout=0.05)
+        tool, started, release = make_blocking_tool(controller)
+        first = asyncio.ensure_future(tool(1))
+        await wait_for_event(started)
+        second = await tool(2)
+        release.set()
+        await first
+        return second, controller.stats()["tools"]["tool"]
+
+    second, stats = asyncio.run(scenario())
+    assert second["error"] == "서버 혼잡"
+    assert "대기 시간" in second["message"]
+    assert stats["rejected_timeout"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["active"] == 0
+
+
+def test_released_slot_is_handed_to_waiter():
+    async def scenario():
+        controller = AdmissionController(default_limit=1, max_queue=4, queue_timeout=5)
+        tool, started, release = make_blocking_tool(controller)
+        first = asyncio.ensure_future(tool(1))
+        await wait_for_event(started)
+        second = asyncio.ensure_future(tool(2))
+        await asyncio.sleep(0.01)
+        queued = controller.stats()["tools"]["tool"]
+        release.set()
+        results = await asyncio.gather(first, second)
+        return queued, results, controller.stats()["tools"]["tool"]
+
+    queued, results, stats = asyncio.run(scenario())
+    # 대기 중에는 슬롯이 하나만 사용되고, 반납된 슬롯을 대기자가 그대로 넘겨받음
+    assert queued["active"] == 1 and queued["queue_depth"] == 1
+    assert results == [{"value": 1}, {"value": 2}]
+    assert stats["admitted"] == 2 and stats["queued"] == 1
+    assert stats["active"] == 0 and stats["rejected_timeout"] == 0
+
+
+def test_thread_capacity_covers_all_tool_slots():
+    controller = AdmissionController(default_limit=32, limits=parse_limits("heavy=4"))
+    for name in ("a", "b", "c", "heavy"):
+        controller.guard(name)(lambda: {})
+    assert controller.thread_capacity() == 100
+    assert controller.stats()["thread_capacity"] == 100
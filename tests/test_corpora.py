@@ -0,0 +1,64 @@
+import json
+
+from corpora import Corpus, CorpusRegistry
+from corpus_file import build_corpus_file
+from response_data import ALL_RESPONSES
+from responses import QUESTION_CATEGORIES
+
+
+def test_partial_category_labels_cover_every_response_category(tmp_path):
+    data = {
+        "categories": {"marriage": "결혼 (부산)"},
+        "responses": {"marriage": ALL_RESPONSES["marriage"], "job": ALL_RESPONSES["job"]}
+    }
+    with open(tmp_path / "busan.json", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    build_corpus_file(str(tmp_path / "busan2.hqc"), data["responses"], data["categories"])
+
+    registry = CorpusRegistry()
+    assert registry.register_directory(str(tmp_path)) == ["busan", "busan2"]
+    for corpus_id in ("busan", "busan2"):
+        corpus = registry.get(corpus_id)
+        assert corpus.categories == {"marriage": "결혼 (부산)", "job": QUESTION_CATEGORIES["job"]}
+        # 키워드로 job에 감지된 질문도 이름이 있는 카테고리로 이어짐
+        assert corpus.detect_category("회사 다니니") == "job"
+        assert corpus.detect_category("회사 다니니") in corpus.categories
+
+
+def sized_corpus(corpus_id, size):
+    corpus = Corpus(corpus_id, {"job": ALL_RESPONSES["job"]})
+    corpus.size_bytes = size
+    return corpus
+
+
+def test_registry_evicts_least_recently_used_over_budget():
+    registry = CorpusRegistry(memory_budget=250)
+    loads = []
+    for corpus_id in ("a", "b", "c"):
+        registry.register(corpus_id, lambda cid=corpus_id: loads.append(cid) or sized_corpus(cid, 100))
+
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")  # b가 가장 오래 사용되지 않은 코퍼스가 됨
+    registry.get("c")
+    assert set(registry.loaded()) == {"a", "c"}
+    assert registry.stats()["evictions"] == 1
+
+    registry.get("b")  # 축출된 코퍼스는 다시 로드
+    assert loads == ["a", "b", "c", "b"]
+    assert set(registry.loaded()) == {"c", "b"}
+
+
+def test_registry_never_evicts_pinned_corpus():
+    registry = CorpusRegistry(memory_budget=150)
+    registry.register("default", lambda: sized_corpus("default", 100), pinned=True)
+    registry.register("a", lambda: sized_corpus("a", 100))
+    registry.register("b", lambda: sized_corpus("b", 100))
+
+    registry.get("default")
+    registry.get("a")
+    registry.get("b")
+    assert set(registry.loaded()) == {"default", "b"}
+    # 고정 코퍼스와 방금 로드한 코퍼스만 남으면 예산을 넘어도 더 축출하지 않음
+    assert registry.stats()["memory_used_bytes"] == 200
+    assert registry.stats()["corpora"]["default"]["pinned"]
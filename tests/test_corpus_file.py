@@ -0,0 +1,125 @@
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
+
+import pytest
+
+from corpora import Corpus
+from corpus_file import MappedCorpus, build_corpus_file
+from response_data import ALL_RESPONSES
+from responses import CATEGORY_KEYWORDS, QUESTION_CATEGORIES
+
+SAMPLE_QUESTIONS = ["결혼은 언제 하니?", "애인은 있니?", "취업은 했니?", "살 좀 빠졌네", "아무 말", ""]
+
+
+@pytest.fixture(scope="module")
+def corpora(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("hqc") / "default.hqc")
+    build_corpus_file(path, ALL_RESPONSES, QUESTION_CATEGORIES, CATEGORY_KEYWORDS)
+    legacy = Corpus("default", ALL_RESPONSES, QUESTION_CATEGORIES, CATEGORY_KEYWORDS)
+    return legacy, MappedCorpus("default", path)
+
+
+def test_metadata_matches_json_backend(corpora):
+    legacy, mapped = corpora
+    assert mapped.version == legacy.version
+    assert mapped.categories == legacy.categories
+    assert mapped.keywords == legacy.keywords
+    assert mapped.default_category == legacy.default_category
+    for question in SAMPLE_QUESTIONS:
+        assert mapped.detect_category(question) == legacy.detect_category(question)
+
+
+def test_lookups_and_ordering_round_trip(corpora):
+    _, mapped = corpora
+    assert list(mapped.responses) == list(ALL_RESPONSES)
+    for category, questions in ALL_RESPONSES.items():
+        view = mapped.responses[category]
+        # 질문/스타일/답변 순서는 원본 삽입 순서 그대로
+        assert list(view) == list(questions)
+        for question, styles in questions.items():
+            assert list(view[question]) == list(styles)
+            for style, answers in styles.items():
+                assert list(view[question][style]) == answers
+
+
+def test_missing_question_raises_key_error(corpora):
+    _, mapped = corpora
+    with pytest.raises(KeyError):
+        mapped.responses["marriage"]["없는 질문"]
+    assert "없는 질문" not in mapped.responses["marriage"]
+
+
+def test_seeded_selection_matches_json_backend(corpora):
+    legacy, mapped = corpora
+    for category, questions in ALL_RESPONSES.items():
+        for question, styles in questions.items():
+            for style in styles:
+                seed = f"7|{category}|{question}|{style}"
+                assert (mapped.get_response(category, question, style, random.Random(seed))
+                        == legacy.get_response(category, question, style, random.Random(seed)))
+
+
+def test_question_scan_keeps_no_decoded_keys(corpora, main):
+    _, mapped = corpora
+    assert mapped.question_keys == {}
+    view = mapped.responses["marriage"]
+    decoded = sum(sys.getsizeof(key) for key in view)
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(3):
+            assert main.match_question_key(mapped, "marriage", "맞는 질문 없음") == next(iter(view))
+        gc.collect()
+        grown = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if started:
+            tracemalloc.stop()
+    # 순회한 질문 키를 뷰에 붙잡아 두지 않으므로 힙이 디코딩된 키 크기만큼 늘지 않음
+    assert set(vars(view)) == {"_file", "_start", "_count"}
+    assert grown < decoded / 2
+
+
+def test_explicit_empty_keywords_build_identically(tmp_path):
+    responses = {"job": ALL_RESPONSES["job"]}
+    path = str(tmp_path / "jobonly.hqc")
+    version = build_corpus_file(path, responses, keywords={})
+    legacy = Corpus("jobonly", responses, keywords={})
+    mapped = MappedCorpus("jobonly", path)
+    assert version == legacy.version == mapped.version
+    assert legacy.keywords == mapped.keywords == {}
+    assert mapped.detect_category("취업은 했니?") == legacy.detect_category("취업은 했니?") == "job"
+
+
+def test_default_category_is_stored(tmp_path):
+    responses = {"job": ALL_RESPONSES["job"], "age": ALL_RESPONSES["age"]}
+    path = str(tmp_path / "partner.hqc")
+    build_corpus_file(path, responses, default_category="age")
+    mapped = MappedCorpus("partner", path)
+    assert mapped.default_category == "age"
+    assert mapped.detect_category("아무 말") == "age"
+    with pytest.raises(ValueError):
+        build_corpus_file(str(tmp_path / "bad.hqc"), responses, default_category="marriage")
+
+
+def test_server_with_default_corpus_file_skips_builtin_data(corpora, tmp_path):
+    _, mapped = corpora
+    script = (
+        "import json, sys, main; "
+        "print(json.dumps({'imported': 'response_data' in sys.modules, "
+        "'version': main.warm_cache.corpus_version}))"
+    )
+    env = dict(os.environ, HOLIDAY_DEFAULT_CORPUS_FILE=mapped.file.path, HOLIDAY_CACHE_PATH="",
+               HOLIDAY_CORPUS_DIR=str(tmp_path))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", script], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=60, check=True)
+    # 웜 캐시 버전은 파일 헤더에서 가져오고 내장 답변 데이터는 로드하지 않음
+    assert json.loads(output.stdout.strip().splitlines()[-1]) == {"imported": False, "version": mapped.version}
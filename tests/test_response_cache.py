@@ -0,0 +1,53 @@
+from starlette.testclient import TestClient
+
+from response_cache import ResponseCache, compute_etag, etag_matches
+
+
+def test_etag_is_weak_and_ignores_timestamp():
+    result = {"response": "답변", "seed": 7, "timestamp": "2026-01-01T00:00:00Z"}
+    etag = compute_etag(result)
+    assert etag.startswith('W/"')
+    assert compute_etag(dict(result, timestamp="2026-01-02T00:00:00Z")) == etag
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag[2:], etag)  # 약한 비교는 W/ 접두사를 무시
+    assert etag_matches('"other", ' + etag, etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+
+
+def test_cache_returns_copies_with_resolution():
+    cache = ResponseCache()
+    result = {"response": "답변"}
+    cache.put("key", result, ("marriage", "결혼은 언제 하니?"))
+    result["response"] = "변경"
+
+    cached, resolution = cache.get("key")
+    assert cached == {"response": "답변"} and resolution == ("marriage", "결혼은 언제 하니?")
+    cached["response"] = "변경"
+    assert cache.get("key")[0] == {"response": "답변"}
+
+
+def test_seeded_http_response_etag_and_not_modified(main):
+    params = {"question": "결혼은 언제 하니? 올해는?", "style": "witty", "seed": 7}
+    with TestClient(main.mcp.http_app()) as client:
+        first = client.get("/api/response", params=params)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"') and first.json()["etag"] == etag
+
+        # 같은 seed는 timestamp를 제외하면 같은 결과 (응답 캐시 적중)
+        second = client.get("/api/response", params=params)
+        body = {k: v for k, v in second.json().items() if k != "timestamp"}
+        assert body == {k: v for k, v in first.json().items() if k != "timestamp"}
+        assert second.headers["etag"] == etag
+
+        not_modified = client.get("/api/response", params=params, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304 and not_modified.headers["etag"] == etag
+
+        other_seed = client.get("/api/response", params=dict(params, seed=8), headers={"If-None-Match": etag})
+        assert other_seed.status_code == 200
+
+    # 최초 실행, 캐시 적중, 다른 seed 실행이 집계됨 (304는 파이프라인을 실행하지 않음)
+    counts = [entry["count"] for entry in main.warm_cache.most_popular(100)
+              if entry["question"] == first.json()["matched_question"] and entry["category_key"] == "marriage"]
+    assert counts == [3]
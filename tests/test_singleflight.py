@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def run_concurrently(count, target):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    def compute():
+        executions.append(1)
+        time.sleep(0.1)
+        return "resolved"
+
+    results, errors = run_concurrently(8, lambda: flight.do("key", compute))
+    assert not errors
+    assert len(executions) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert {value for value, _ in results} == {"resolved"}
+    stats = flight.stats()
+    assert stats["calls"] == 8 and stats["executions"] == 1 and stats["coalesced"] == 7
+    assert stats["coalescing_ratio"] == 0.875 and stats["in_flight"] == 0
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_leader_error_propagates_to_followers():
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    results, errors = run_concurrently(4, lambda: flight.do("key", fail))
+    assert not results
+    assert len(errors) == 4 and all(isinstance(e, ValueError) for e in errors)
+    # 실패한 계산은 남지 않으므로 다음 호출은 새로 실행
+    assert flight.do("key", lambda: "ok") == ("ok", False)
+
+
+def test_follower_runs_locally_after_wait_timeout():
+    flight = SingleFlight(wait_timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("key", lambda: release.wait(5) and "slow"))
+    leader.start()
+    while not flight.stats()["in_flight"]:
+        time.sleep(0.001)
+
+    started = time.perf_counter()
+    assert flight.do("key", lambda: "local") == ("local", False)
+    assert time.perf_counter() - started < 1
+    release.set()
+    leader.join(5)
+    stats = flight.stats()
+    assert stats["wait_timeouts"] == 1 and stats["executions"] == 2 and stats["coalesced"] == 0
+
+
+def test_error_is_not_swallowed_for_leader():
+    flight = SingleFlight()
+    with pytest.raises(KeyError):
+        flight.do("key", lambda: {}["missing"])
+    assert flight.stats()["in_flight"] == 0
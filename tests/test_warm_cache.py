@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+
+from warm_cache import SNAPSHOT_FORMAT, WarmCache
+
+
+def populated(path, version="v1"):
+    cache = WarmCache(version, path=path)
+    cache.put_resolution(version, "auto", "결혼은?", ("marriage", "결혼은 언제 하니?"))
+    cache.put_variant("답변", {"age": 30}, "30살 답변")
+    cache.record_hit(version, "default", "marriage", "결혼은 언제 하니?")
+    return cache
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "warm.json")
+    assert populated(path).save()
+
+    restored = WarmCache("v1", path=path)
+    assert restored.load()
+    assert restored.get_resolution("v1", "auto", "결혼은?") == ("marriage", "결혼은 언제 하니?")
+    assert restored.get_variant("답변", {"age": 30}) == "30살 답변"
+    assert restored.most_popular() == [{
+        "corpus": "default", "corpus_version": "v1", "category_key": "marriage",
+        "question": "결혼은 언제 하니?", "count": 1
+    }]
+
+
+def test_snapshot_for_other_corpus_version_is_rejected(tmp_path):
+    path = str(tmp_path / "warm.json")
+    populated(path, version="old").save()
+
+    cache = WarmCache("new", path=path)
+    assert not cache.load()
+    assert cache.stats()["resolutions"] == 0 and cache.stats()["popular_questions"] == 0
+
+
+def test_snapshot_with_other_format_is_rejected(tmp_path):
+    path = str(tmp_path / "warm.json")
+    populated(path).save()
+    with open(path, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    snapshot["format"] = SNAPSHOT_FORMAT - 1
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+
+    assert not WarmCache("v1", path=path).load()
+
+
+def test_concurrent_saves_leave_valid_snapshot(tmp_path):
+    path = str(tmp_path / "warm.json")
+    cache = populated(path)
+    threads = [threading.Thread(target=cache.save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert WarmCache("v1", path=path).load()
+    # 고유한 임시 파일은 교체 후 남지 않음
+    assert os.listdir(tmp_path) == ["warm.json"]
+
+
+def test_close_stops_periodic_thread(tmp_path):
+    cache = populated(str(tmp_path / "warm.json"))
+    cache.start_periodic_snapshot(0.01)
+    thread = cache._thread
+    cache.close()
+    assert not thread.is_alive()
+    assert WarmCache("v1", path=str(tmp_path / "warm.json")).load()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+재시작 후에도 유지되는 웜 캐시
+질문 매칭 결과, 맞춤형 답변 변형, 인기 질문 카운터를 보관하고
+종료 시/주기적으로 디스크에 스냅샷합니다.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 3
+
+
+class WarmCache:
+    """LRU 기반 매칭/변형 캐시와 인기 카운터
+
+    스냅샷에는 기본 코퍼스 버전 해시가 함께 저장되며, 로드 시 현재 코퍼스와
+    버전이 다르면 스냅샷을 버리고 빈 캐시로 시작합니다. 매칭 결과는 코퍼스
+    버전 단위로 구분되어 여러 코퍼스가 한 캐시를 공유할 수 있습니다.
+    인기 카운터도 코퍼스 버전별로 집계되어, 내용이 바뀐 코퍼스는 새로 집계됩니다.
+    """
+
+    def __init__(self, corpus_version: str, path: Optional[str] = None, max_entries: int = 10000):
+        self.corpus_version = corpus_version
+        self.path = path
+        self.max_entries = max_entries
+        self._resolutions: "OrderedDict[Tuple[str, str, str], Tuple[str, str]]" = OrderedDict()
+        self._variants: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._popularity: Counter = Counter()  # (코퍼스 버전, 코퍼스 ID, 카테고리, 질문) -> 횟수
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.loaded_at: Optional[str] = None
+        self.saved_at: Optional[str] = None
+
+    # 매칭 결과 캐시
+    def get_resolution(self, namespace: str, category: str, question: str,
+                       count: bool = True) -> Optional[Tuple[str, str]]:
+        """(코퍼스 버전, 요청 카테고리, 질문) -> (감지 카테고리, 매칭 질문) 조회
+
+        한 요청이 여러 번 조회할 때는 count=False로 조회하고 최종 결과만 count_lookup으로 집계합니다.
+        """
+        key = (namespace, category, question)
+        with self._lock:
+            value = self._resolutions.get(key)
+            if value is not None:
+                self._resolutions.move_to_end(key)
+            if count:
+                self._count(value is not None)
+            return value
+
+    def count_lookup(self, hit: bool) -> None:
+        """count=False로 조회한 매칭 결과의 적중/실패 집계"""
+        with self._lock:
+            self._count(hit)
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def put_resolution(self, namespace: str, category: str, question: str, resolved: Tuple[str, str]) -> None:
+        with self._lock:
+            self._put(self._resolutions, (namespace, category, question), tuple(resolved))
+
+    # 맞춤형 답변 변형 캐시
+    def get_variant(self, response: str, user_situation: Dict[str, Any]) -> Optional[str]:
+        key = (response, _situation_key(user_situation))
+        with self._lock:
+            value = self._variants.get(key)
+            if value is not None:
+                self._variants.move_to_end(key)
+            return value
+
+    def put_variant(self, response: str, user_situation: Dict[str, Any], customized: str) -> None:
+        with self._lock:
+            self._put(self._variants, (response, _situation_key(user_situation)), customized)
+
+    # 인기 질문 카운터
+    def record_hit(self, namespace: str, corpus_id: str, category: str, question_key: str) -> None:
+        with self._lock:
+            self._popularity[(namespace, corpus_id, category, question_key)] += 1
+
+    def most_popular(self, n: int = 10) -> list:
+        with self._lock:
+            return [
+                {"corpus": corpus_id, "corpus_version": ns, "category_key": category,
+                 "question": question, "count": count}
+                for (ns, corpus_id, category, question), count in self._popularity.most_common(n)
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "corpus_version": self.corpus_version,
+                "resolutions": len(self._resolutions),
+                "variants": len(self._variants),
+                "popular_questions": len(self._popularity),
+                "hits": self.hits,
+                "misses": self.misses,
+                "loaded_at": self.loaded_at,
+                "saved_at": self.saved_at
+            }
+
+    def snapshot_tables(self) -> Dict[str, Any]:
+        """메모리 측정용 내부 테이블 사본 (잠금 안에서 복사해 동시 수정과 충돌하지 않음)"""
+        with self._lock:
+            return {
+                "resolutions": OrderedDict(self._resolutions),
+                "variants": OrderedDict(self._variants),
+                "popularity": Counter(self._popularity)
+            }
+
+    def _put(self, table: OrderedDict, key, value) -> None:
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+
+    # 스냅샷 저장/복원
+    def save(self) -> bool:
+        """현재 캐시를 디스크에 저장 (고유한 임시 파일 작성 후 교체, 동시 저장은 직렬화)"""
+        if not self.path:
+            return False
+        with self._save_lock:
+            return self._save()
+
+    def _save(self) -> bool:
+        with self._lock:
+            snapshot = {
+                "format": SNAPSHOT_FORMAT,
+                "corpus_version": self.corpus_version,
+                "resolutions": [[ns, c, q, r[0], r[1]] for (ns, c, q), r in self._resolutions.items()],
+                "variants": [[resp, situation, v] for (resp, situation), v in self._variants.items()],
+                "popularity": [[ns, cid, c, q, n] for (ns, cid, c, q), n in self._popularity.items()]
+            }
+        tmp_path = None
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".warm_cache.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"웜 캐시 저장 실패: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        self.saved_at = _now()
+        return True
+
+    def load(self) -> bool:
+        """디스크 스냅샷 복원 (코퍼스 버전이 일치할 때만)"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"웜 캐시 로드 실패: {e}")
+            return False
+        if snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("corpus_version") != self.corpus_version:
+            logger.info("코퍼스 버전이 달라 웜 캐시 스냅샷을 무시합니다.")
+            return False
+        with self._lock:
+            for ns, c, q, category, key in snapshot.get("resolutions", []):
+                self._put(self._resolutions, (ns, c, q), (category, key))
+            for resp, situation, v in snapshot.get("variants", []):
+                self._put(self._variants, (resp, situation), v)
+            for ns, cid, c, q, n in snapshot.get("popularity", []):
+                self._popularity[(ns, cid, c, q)] += n
+        self.loaded_at = _now()
+        logger.info(f"웜 캐시 복원: 매칭 {len(self._resolutions)}개, 변형 {len(self._variants)}개")
+        return True
+
+    def start_periodic_snapshot(self, interval: float) -> None:
+        """백그라운드 스레드에서 interval초마다 스냅샷 저장"""
+        if not self.path or interval <= 0 or self._thread is not None:
+            return
+
+        def _run():
+            while not self._stop.wait(interval):
+                self.save()
+
+        self._thread = threading.Thread(target=_run, name="warm-cache-snapshot", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """주기 저장 스레드를 멈추고 기다린 뒤 마지막 스냅샷 저장"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.save()
+
+
+def _situation_key(user_situation: Dict[str, Any]) -> str:
+    return json.dumps(user_situation, ensure_ascii=False, sort_keys=True)
+
+
+def _now() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")